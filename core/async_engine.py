@@ -0,0 +1,148 @@
+# =========================================================
+# ===== file: core/async_engine.py
+# =========================================================
+import asyncio
+from typing import Dict, Optional
+
+from core.audit.logger import AuditLogger, BufferedAuditLogger
+from core.engine import LatentFlowEngine
+from core.infer.cost import CostCounter
+from core.session.state_store import StateStore
+
+
+def _non_blocking(audit_logger):
+    # emits run on the event loop: file I/O or a wait on a full queue would stall it.
+    # The caller's logger is used as given (never swapped), so it must be loop-safe.
+    if isinstance(audit_logger, BufferedAuditLogger):
+        if not audit_logger.drop_when_full:
+            raise ValueError("AsyncLatentFlowEngine needs BufferedAuditLogger(drop_when_full=True)")
+    elif isinstance(audit_logger, AuditLogger):
+        raise TypeError("AsyncLatentFlowEngine needs a BufferedAuditLogger(drop_when_full=True), "
+                        "not a plain AuditLogger (it writes on the caller's thread)")
+    return audit_logger
+
+
+class AsyncLatentFlowEngine:
+    """
+    asyncio front end for LatentFlowEngine.
+    - consume/consume_many/reason are coroutines; the state work itself is
+      CPU-only and runs inline on the loop (no thread hop)
+    - audit_logger must be a BufferedAuditLogger(drop_when_full=True), so emits
+      never block the loop (a custom logger is used as is and must not block).
+      The caller owns it: close() only flushes it, unless close_logger=True
+    - session API (submit/submit_many/reason_session) keeps per-session order with
+      a FIFO asyncio.Lock per session, and bounds in-flight requests with
+      max_pending (callers wait when the engine is saturated)
+    """
+
+    def __init__(self, plugins=None, guard=None, verifier=None, audit_logger=None,
+                 store: Optional[StateStore] = None, max_pending: int = 1024, close_logger: bool = False):
+        self.engine = LatentFlowEngine(
+            plugins=plugins,
+            guard=guard,
+            verifier=verifier,
+            audit_logger=_non_blocking(audit_logger),
+        )
+        self.store = store if store is not None else StateStore()
+        self.cost = CostCounter()
+        self.max_pending = max_pending
+        self.close_logger = close_logger
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @property
+    def audit_logger(self):
+        return self.engine.audit_logger
+
+    def init(self):
+        return self.engine.init()
+
+    # ---- state API (caller owns the state) ----
+    async def consume(self, state, block, cost):
+        return self.engine.consume(state, block, cost)
+
+    async def consume_many(self, state, blocks, cost, partial: bool = False):
+        return self.engine.consume_many(state, blocks, cost, partial=partial)
+
+    async def reason(self, state):
+        return self.engine.reason(state)
+
+    # ---- session API (state lives in self.store) ----
+    async def submit(self, session_id: str, block):
+        async with self._session(session_id):
+            state, delta, guard_trace = self.engine.consume(self.store.get(session_id), block, self.cost)
+            self.store.commit(session_id, state)
+            return delta, guard_trace
+
+    async def submit_many(self, session_id: str, blocks, partial: bool = False):
+        async with self._session(session_id):
+            state, delta, trace = self.engine.consume_many(self.store.get(session_id), blocks, self.cost, partial=partial)
+            self.store.commit(session_id, state)
+            return delta, trace
+
+    async def reason_session(self, session_id: str):
+        async with self._session(session_id):
+            return self.engine.reason(self.store.get(session_id))
+
+    async def close(self):
+        logger = self.audit_logger
+        if logger is not None:
+            # close()/flush() wait for the writer thread; keep that off the loop
+            done = logger.close if self.close_logger else getattr(logger, "flush", None)
+            if done is not None:
+                await asyncio.get_running_loop().run_in_executor(None, done)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ---- internals ----
+    def _session(self, session_id: str):
+        return _SessionSlot(self, session_id)
+
+
+class _SessionSlot:
+    """
+    async context: acquire a pending slot (backpressure), then the session lock (ordering).
+    """
+
+    def __init__(self, engine: AsyncLatentFlowEngine, session_id: str):
+        self.engine = engine
+        self.session_id = session_id
+
+    async def __aenter__(self):
+        eng = self.engine
+        if eng._pending is None:
+            # created lazily so it binds to the running loop
+            eng._pending = asyncio.Semaphore(eng.max_pending)
+        await eng._pending.acquire()
+        lock = eng._locks.get(self.session_id)
+        if lock is None:
+            lock = eng._locks[self.session_id] = asyncio.Lock()
+        eng._waiters[self.session_id] = eng._waiters.get(self.session_id, 0) + 1
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._release_waiter()
+            eng._pending.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        eng = self.engine
+        eng._locks[self.session_id].release()
+        self._release_waiter()
+        eng._pending.release()
+
+    def _release_waiter(self):
+        eng = self.engine
+        n = eng._waiters[self.session_id] - 1
+        if n:
+            eng._waiters[self.session_id] = n
+        else:
+            # last user of this session: drop the lock so idle sessions cost nothing
+            del eng._waiters[self.session_id]
+            del eng._locks[self.session_id]
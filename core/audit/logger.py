@@ -1,9 +1,13 @@
 # core/audit/logger.py
 import json
 import os
+import queue
+import random
+import threading
 import time
 import hashlib
-from typing import Any, Dict, Optional
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Union
 
 
 def fingerprint(payload: Any) -> Dict[str, Any]:
@@ -21,23 +25,322 @@ def _safe(x: Any) -> Any:
         return x.summary()
     return str(x)
 
+# audit levels (same scale as the stdlib logging module)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# default level per event type; unknown events are INFO
+EVENT_LEVELS: Dict[str, int] = {
+    "compress": DEBUG,
+    "consume_ok": INFO,
+    "consume_batch_ok": INFO,
+    "reason": INFO,
+    "tool_exec": INFO,
+    "plan_search": INFO,
+    "consume_rejected": WARNING,
+    "consume_violation": ERROR,
+    "consume_batch_violation": ERROR,
+}
+
+Payload = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+
 class AuditLogger:
     """
     JSONL logger for ELK/Datadog. One event per line.
+    - level: events below this level are dropped
+    - sample_rates: per-event keep probability, e.g. {"consume_ok": 0.01}
+    - payload may be a zero-arg callable; it is only evaluated if the record is written
     """
 
-    def __init__(self, path: Optional[str] = "logs/audit.jsonl", also_stdout: bool = False):
+    def __init__(
+        self,
+        path: Optional[str] = "logs/audit.jsonl",
+        also_stdout: bool = False,
+        level: int = DEBUG,
+        sample_rates: Optional[Dict[str, float]] = None,
+        event_levels: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None,
+    ):
         self.path = path
         self.also_stdout = also_stdout
+        self.level = level
+        self.sample_rates = dict(sample_rates or {})
+        self.event_levels = dict(EVENT_LEVELS)
+        self.event_levels.update(event_levels or {})
+        self._rng = random.Random(seed)
         if self.path:
             os.makedirs(os.path.dirname(self.path), exist_ok=True)
 
-    def emit(self, event: str, payload: Dict[str, Any]):
+    def enabled_for(self, event: str, level: Optional[int] = None) -> bool:
+        if level is None:
+            level = self.event_levels.get(event, INFO)
+        if level < self.level:
+            return False
+        rate = self.sample_rates.get(event)
+        if rate is None or rate >= 1.0:
+            return True
+        return self._rng.random() < rate
+
+    def emit(self, event: str, payload: Payload, level: Optional[int] = None):
+        if not self.enabled_for(event, level):
+            return
+        if callable(payload):
+            payload = payload()
         record = {"ts": time.time(), "event": event}
         record.update({k: _safe(v) for k, v in payload.items()})
+        self._emit_record(record)
+
+    def _emit_record(self, record: Dict[str, Any]):
         line = json.dumps(record, ensure_ascii=False)
         if self.path:
             with open(self.path, "a", encoding="utf-8") as f:
                 f.write(line + "\n")
         if self.also_stdout:
-            print(line)
\ No newline at end of file
+            print(line)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _freeze(x: Any) -> Any:
+    # structural copy of containers so the writer thread never sees later mutations
+    if isinstance(x, dict):
+        return {k: _freeze(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_freeze(v) for v in x]
+    return x
+
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+class _AuditWriter:
+    """
+    Writer-thread side of BufferedAuditLogger: queue, file handle, rotation and
+    counters. The thread only references this object, never the logger, so an
+    unclosed logger can be garbage-collected (its finalizer stops the writer).
+    """
+
+    def __init__(self, path, also_stdout, flush_bytes, flush_interval, rotate_bytes, rotate_interval, max_queue):
+        self.path = path
+        self.also_stdout = also_stdout
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.f = None
+        self.segment_bytes = 0
+        self.segment_started = time.time()
+        self.dropped = 0
+        self.write_errors = 0
+        if self.path:
+            self.open()
+        self.thread = threading.Thread(target=self.run, name="audit-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, item, poll: float = 0.1):
+        # a full queue blocks the caller, but never forever on a dead writer
+        while True:
+            if not self.thread.is_alive():
+                raise RuntimeError("audit writer thread is not running")
+            try:
+                self.q.put(item, timeout=poll)
+                return
+            except queue.Full:
+                continue
+
+    def stop(self, timeout: Optional[float] = None):
+        if self.thread.is_alive():
+            try:
+                self.put(_CLOSE)
+            except RuntimeError:
+                pass
+            self.thread.join(timeout)
+        if self.f and not self.thread.is_alive():
+            self.f.close()
+            self.f = None
+
+    def open(self):
+        self.f = open(self.path, "a", encoding="utf-8")
+        self.segment_bytes = self.f.tell()
+        self.segment_started = time.time()
+
+    def should_rotate(self) -> bool:
+        if self.rotate_bytes is not None and self.segment_bytes >= self.rotate_bytes:
+            return True
+        if self.rotate_interval is not None and time.time() - self.segment_started >= self.rotate_interval:
+            return self.segment_bytes > 0
+        return False
+
+    def rotate(self):
+        self.f.close()
+        base = f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}"
+        target, n = base, 1
+        while os.path.exists(target):
+            target = f"{base}.{n}"
+            n += 1
+        os.replace(self.path, target)
+        self.open()
+
+    def dumps(self, record) -> Optional[str]:
+        try:
+            return json.dumps(record, ensure_ascii=False)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return json.dumps(record, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):  # e.g. circular references
+            self.dropped += 1
+            return None
+
+    def write(self, lines: List[str]):
+        if not lines:
+            return
+        data = "\n".join(lines) + "\n"
+        try:
+            if self.f:
+                self.f.write(data)
+                self.f.flush()
+                self.segment_bytes += len(data.encode("utf-8"))
+                if self.should_rotate():
+                    self.rotate()
+            if self.also_stdout:
+                print(data, end="")
+        except (OSError, ValueError):
+            self.write_errors += 1
+
+    def run(self):
+        pending: List[str] = []
+        pending_bytes = 0
+        last_flush = time.time()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.time() - last_flush))
+            try:
+                item = self.q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _CLOSE:
+                self.write(pending)
+                return
+            if isinstance(item, tuple) and item and item[0] is _FLUSH:
+                self.write(pending)
+                pending, pending_bytes, last_flush = [], 0, time.time()
+                item[1].set()
+                continue
+            if item is not None:
+                line = self.dumps(item)
+                if line is not None:
+                    pending.append(line)
+                    pending_bytes += len(line) + 1
+
+            if pending_bytes >= self.flush_bytes or time.time() - last_flush >= self.flush_interval:
+                self.write(pending)
+                pending, pending_bytes, last_flush = [], 0, time.time()
+
+
+def _writer_setting(name: str):
+    # logger attribute backed by its writer (read by the writer thread)
+    return property(lambda self: getattr(self._w, name), lambda self, v: setattr(self._w, name, v))
+
+
+class BufferedAuditLogger(AuditLogger):
+    """
+    JSONL logger with a persistent file handle and a background writer thread.
+    - emit() only copies the record and queues it; json.dumps + I/O run on the writer
+    - flushes every flush_bytes or flush_interval seconds, or on flush()/close()
+    - rotates the file into "<path>.<YYYYmmdd-HHMMSS>[.n]" segments by size and/or age
+    - a record json.dumps cannot encode is retried with default=str, else dropped and
+      counted in dropped; write errors are counted in write_errors. Neither stops the writer
+    - drop_when_full=True: emit() never waits on a full queue; the record is dropped
+      and counted in overflow_dropped (use this on an asyncio event loop)
+    - an unclosed logger is closed when garbage-collected or at interpreter exit
+      (weakref.finalize), so per-session loggers do not pile up
+    """
+
+    flush_bytes = _writer_setting("flush_bytes")
+    flush_interval = _writer_setting("flush_interval")
+    rotate_bytes = _writer_setting("rotate_bytes")
+    rotate_interval = _writer_setting("rotate_interval")
+    dropped = _writer_setting("dropped")
+    write_errors = _writer_setting("write_errors")
+
+    def __init__(
+        self,
+        path: Optional[str] = "logs/audit.jsonl",
+        also_stdout: bool = False,
+        flush_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        rotate_bytes: Optional[int] = None,
+        rotate_interval: Optional[float] = None,
+        max_queue: int = 10000,
+        drop_when_full: bool = False,
+        level: int = DEBUG,
+        sample_rates: Optional[Dict[str, float]] = None,
+        event_levels: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(
+            path=path,
+            also_stdout=also_stdout,
+            level=level,
+            sample_rates=sample_rates,
+            event_levels=event_levels,
+            seed=seed,
+        )
+        self.drop_when_full = drop_when_full
+        self.overflow_dropped = 0
+        self._closed = False
+        self._w = _AuditWriter(path, also_stdout, flush_bytes, flush_interval, rotate_bytes, rotate_interval, max_queue)
+        self._q = self._w.q
+        self._thread = self._w.thread
+        # no strong reference to self: the logger can still be collected
+        self._finalizer = weakref.finalize(self, self._w.stop)
+
+    def _emit_record(self, record: Dict[str, Any]):
+        if self._closed:
+            raise RuntimeError("BufferedAuditLogger is closed")
+        if not self.drop_when_full:
+            self._w.put(_freeze(record))
+            return
+        if not self._thread.is_alive():
+            raise RuntimeError("audit writer thread is not running")
+        try:
+            self._q.put_nowait(_freeze(record))
+        except queue.Full:
+            self.overflow_dropped += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is written; False on timeout or dead writer."""
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._w.put((_FLUSH, done))
+        deadline = None if timeout is None else time.time() + timeout
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                return False
+            if deadline is not None and time.time() >= deadline:
+                return False
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._w.stop(timeout)
@@ -1,16 +1,16 @@
 # core/engine.py
-f
 # =========================================================
 # ===== file: core/engine.py
 # =========================================================
 from core.state.latent_state import LatentState
-from core.input.incremental import incremental_update
+from core.input.incremental import incremental_update, incremental_update_many
 
 
 class LatentFlowEngine:
     """
     v0.2 Engine:
     - consume(): incremental update + guard + invariants + audit + rollback on failure
+    - consume_many(): same for a batch, with one guard/verify/audit pass per batch
     - reason(): plugin-based decision + audit
     """
 
@@ -33,6 +33,17 @@ class LatentFlowEngine:
             audit_logger=self.audit_logger,
         )
 
+    def consume_many(self, state, blocks, cost, partial: bool = False):
+        return incremental_update_many(
+            state,
+            blocks,
+            cost,
+            guard=self.guard,
+            verifier=self.verifier,
+            audit_logger=self.audit_logger,
+            partial=partial,
+        )
+
     def reason(self, state):
         matched = None
         decision = "no rule matched"
@@ -48,7 +59,7 @@ class LatentFlowEngine:
         trace = {"plugin": matched}
 
         if self.audit_logger:
-            self.audit_logger.emit("reason", {
+            self.audit_logger.emit("reason", lambda: {
                 "decision": output,
                 "trace": trace,
                 "state": state.summary(),
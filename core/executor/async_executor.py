@@ -0,0 +1,48 @@
+# =========================================================
+# ===== file: core/executor/async_executor.py
+# =========================================================
+import asyncio
+import functools
+import inspect
+from typing import Optional
+
+from core.executor.cache import ToolCache
+from core.executor.executor import result_block
+
+
+class AsyncToolExecutor:
+    """
+    asyncio executor: coroutine tools are awaited on the loop, plain sync tools
+    run in the loop's default thread pool (or inline with sync_in_thread=False).
+    Optional per-call timeout (seconds) raises asyncio.TimeoutError.
+    Pure tools are memoized in self.cache, as in ToolExecutor.
+    """
+
+    def __init__(self, registry, audit_logger=None, sync_in_thread: bool = True, timeout: Optional[float] = None,
+                 cache: Optional[ToolCache] = None):
+        self.registry = registry
+        self.audit_logger = audit_logger
+        self.sync_in_thread = sync_in_thread
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ToolCache()
+
+    async def execute(self, action):
+        fn = self.registry.get(action.name)
+        meta = self.registry.meta(action.name)
+        pure = meta.get("pure", False)
+        if pure:
+            cached = self.cache.get(action, meta)
+            if cached is not ToolCache.MISS:
+                return result_block(action, cached, self.audit_logger, self.cache, True)
+        params = action.params or {}
+        if inspect.iscoroutinefunction(fn) or not self.sync_in_thread:
+            result = fn(**params)  # a coroutine, or the sync result itself
+        else:
+            loop = asyncio.get_running_loop()
+            result = loop.run_in_executor(None, functools.partial(fn, **params))
+        if inspect.isawaitable(result):
+            result = await (asyncio.wait_for(result, self.timeout) if self.timeout is not None else result)
+        if pure:
+            self.cache.put(action, meta, result)
+            return result_block(action, result, self.audit_logger, self.cache, False)
+        return result_block(action, result, self.audit_logger)
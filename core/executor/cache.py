@@ -0,0 +1,72 @@
+# =========================================================
+# ===== file: core/executor/cache.py
+# =========================================================
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_MISS = object()
+
+
+class ToolCache:
+    """
+    Per-tool LRU memo for tools registered with pure=True.
+    Keyed on Action.cache_key(); entries expire after the tool's cache_ttl.
+    Cached results are shared between blocks, so treat them as immutable.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, action, meta: Dict[str, Any]) -> Any:
+        """Returns the cached result or ToolCache.MISS."""
+        key = action.cache_key()
+        with self._lock:
+            entries = self._entries.get(action.name)
+            item = entries.get(key) if entries is not None else None
+            if item is not None:
+                stored_at, result = item
+                ttl = meta.get("cache_ttl")
+                if ttl is None or self.clock() - stored_at < ttl:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del entries[key]
+            self.misses += 1
+            return _MISS
+
+    def put(self, action, meta: Dict[str, Any], result: Any):
+        key = action.cache_key()
+        max_entries = meta.get("cache_max_entries") or 1024
+        with self._lock:
+            entries = self._entries.setdefault(action.name, OrderedDict())
+            entries[key] = (self.clock(), result)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": sum(len(e) for e in self._entries.values()),
+            }
+
+
+ToolCache.MISS = _MISS
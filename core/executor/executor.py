@@ -1,32 +1,277 @@
 # =========================================================
 # ===== file: core/executor/executor.py
 # =========================================================
+import inspect
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import List, Optional
+
 from core.infer.block import Block
 from core.audit.logger import fingerprint
+from core.executor.cache import ToolCache
+
+
+def result_block(action, result, audit_logger=None, cache=None, cache_hit=None) -> Block:
+    """
+    Wrap a tool result into a tool_result block (+ tool_exec audit).
+    For pure tools, cache_hit (True/False) and the cache's hit/miss stats go into the audit.
+    """
+    block = Block(
+        content={"tool": action.name, "result": result},
+        block_type="tool_result",
+    )
+
+    if audit_logger:
+        def payload():
+            out = {
+                "action": repr(action),
+                "result_fp": fingerprint(repr(result)),
+            }
+            if cache_hit is not None:
+                out["cache"] = "hit" if cache_hit else "miss"
+                out["cache_stats"] = cache.stats()
+            return out
+        audit_logger.emit("tool_exec", payload)
+
+    return block
+
+
+# how often execute_many checks whether queued calls have started (their timeout clock)
+_START_POLL = 0.01
+# how often execute_many re-checks max_concurrency slots held outside this batch
+_SLOT_POLL = 0.05
+
+
+def _call_tool(name, fn, params):
+    # module-level so it can be shipped to a process pool
+    result = fn(**params)
+    if inspect.isawaitable(result):
+        if inspect.iscoroutine(result):
+            result.close()
+        raise TypeError(f"Tool {name} is async; use AsyncToolExecutor")
+    return result
 
 
 class ToolExecutor:
     """
     Executes tools and returns result blocks to feed back into state.
+    Coroutine tools need AsyncToolExecutor (core/executor/async_executor.py).
+    execute_many() runs independent actions concurrently on a thread pool
+    (or a process pool with use_processes=True; tools must then be picklable).
+    Tools registered with pure=True are memoized in self.cache (a ToolCache,
+    shareable between executors); repeated Actions skip the call entirely.
     """
 
-    def __init__(self, registry, audit_logger=None):
+    def __init__(self, registry, audit_logger=None, max_workers: Optional[int] = None, use_processes: bool = False,
+                 cache: Optional[ToolCache] = None):
         self.registry = registry
         self.audit_logger = audit_logger
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.cache = cache if cache is not None else ToolCache()
+        self._pool = None
+        # tool name -> calls occupying a pool worker, across execute_many calls;
+        # a timed-out call keeps its max_concurrency slot until it really finishes
+        self._running = {}
+        self._slots = threading.Condition()
 
     def execute(self, action):
         fn = self.registry.get(action.name)
+        meta = self.registry.meta(action.name)
+        pure = meta.get("pure", False)
+        if pure:
+            result = self.cache.get(action, meta)
+            if result is not ToolCache.MISS:
+                return result_block(action, result, self.audit_logger, self.cache, True)
         result = fn(**(action.params or {}))
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close()
+            raise TypeError(f"Tool {action.name} is async; use AsyncToolExecutor")
+        if pure:
+            self.cache.put(action, meta, result)
+            return result_block(action, result, self.audit_logger, self.cache, False)
+        return result_block(action, result, self.audit_logger)
 
-        block = Block(
-            content={"tool": action.name, "result": result},
-            block_type="tool_result",
-        )
 
-        if self.audit_logger:
-            self.audit_logger.emit("tool_exec", {
-                "action": repr(action),
-                "result_fp": fingerprint(repr(result)),
-            })
+    def execute_many(self, actions, timeout: Optional[float] = None, return_errors: bool = False) -> List[Block]:
+        """
+        Run independent actions concurrently; blocks come back in the order of `actions`.
+        - per-tool timeout / max_concurrency come from ToolRegistry.register (timeout here is the default)
+        - a failed or timed-out action raises (first one in action order), or with
+          return_errors=True becomes a tool_error block in its slot
+        - pure tools: cached Actions are not submitted, and identical Actions in
+          one batch run once (the rest copy the first one's result or error)
+        A call's timeout counts from when it starts running (observed within
+        _START_POLL seconds), not from submit, so time queued behind other calls
+        is free. A timed-out call cannot be interrupted; it may keep running in the
+        pool and keeps its max_concurrency slot until it finishes. An action that
+        only waits on slots held that way (nothing of this batch in flight) fails
+        with a timeout once it has waited its own timeout.
+        """
+        actions = list(actions)
+        if not actions:
+            return []
+        results: List = [None] * len(actions)
+        errors: List[Optional[BaseException]] = [None] * len(actions)
+        cache_hit: List[Optional[bool]] = [None] * len(actions)
+
+        to_run = []
+        leader = {}     # cache key -> index of the first uncached occurrence
+        followers = {}  # leader index -> duplicate indexes
+        for i, act in enumerate(actions):
+            try:
+                meta = self.registry.meta(act.name)
+            except KeyError:
+                meta = {}  # reported by the submit loop below
+            if not meta.get("pure"):
+                to_run.append(i)
+                continue
+            cached = self.cache.get(act, meta)
+            if cached is not ToolCache.MISS:
+                results[i] = cached
+                cache_hit[i] = True
+                continue
+            cache_hit[i] = False
+            key = (act.name, act.cache_key())
+            if key in leader:
+                followers.setdefault(leader[key], []).append(i)
+                continue
+            leader[key] = i
+            to_run.append(i)
+
+        pending = deque(to_run)
+        pool = self._get_pool() if pending else None
+        inflight = {}  # future -> [index, timeout, deadline (None until the call starts)]
+        slot_timeout = {}  # blocked index -> its timeout
+        waiting = {}       # blocked index -> slot-wait deadline, while only calls outside this batch hold slots
+        while pending or inflight:
+            # submit in action order, skipping tools at their concurrency limit
+            blocked = deque()
+            while pending:
+                i = pending.popleft()
+                act = actions[i]
+                try:
+                    fn = self.registry.get(act.name)
+                    meta = self.registry.meta(act.name)
+                except KeyError as e:
+                    errors[i] = e
+                    continue
+                tool_timeout = meta.get("timeout") if meta.get("timeout") is not None else timeout
+                if not self._acquire(act.name, meta.get("max_concurrency")):
+                    blocked.append(i)
+                    slot_timeout[i] = tool_timeout
+                    continue
+                fut = pool.submit(_call_tool, act.name, fn, act.params or {})
+                fut.add_done_callback(lambda f, name=act.name: self._release(name))
+                inflight[fut] = [i, tool_timeout, None]
+            pending = blocked
+            if not inflight:
+                if pending:
+                    pending = self._wait_for_slots(actions, pending, slot_timeout, waiting, errors)
+                continue
+            waiting.clear()  # queued behind this batch's own calls: free, as in the pool queue
+
+            # start each call's clock once a worker has picked it up
+            now = time.monotonic()
+            deadlines = []
+            queued = False
+            for fut, slot in inflight.items():
+                if slot[1] is None:
+                    continue
+                if slot[2] is None:
+                    if not (fut.running() or fut.done()):
+                        queued = True
+                        continue
+                    slot[2] = now + slot[1]
+                deadlines.append(slot[2])
+            wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+            if queued:
+                wait_for = _START_POLL if wait_for is None else min(wait_for, _START_POLL)
+            done, _ = wait(list(inflight), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for fut in list(inflight):
+                i, _, deadline = inflight[fut]
+                if fut in done:
+                    try:
+                        results[i] = fut.result()
+                    except Exception as e:
+                        errors[i] = e
+                elif deadline is not None and now >= deadline:
+                    fut.cancel()
+                    errors[i] = FutureTimeout(f"tool {actions[i].name} timed out")
+                else:
+                    continue
+                del inflight[fut]
+
+        for i in leader.values():
+            if errors[i] is None:
+                self.cache.put(actions[i], self.registry.meta(actions[i].name), results[i])
+            for j in followers.get(i, ()):
+                results[j], errors[j] = results[i], errors[i]
+
+        blocks: List[Block] = []
+        for i, act in enumerate(actions):
+            if errors[i] is not None:
+                if not return_errors:
+                    raise errors[i]
+                blocks.append(Block(
+                    content={"tool": act.name, "error": f"{errors[i].__class__.__name__}: {errors[i]}"},
+                    block_type="tool_error",
+                ))
+                continue
+            blocks.append(result_block(act, results[i], self.audit_logger, self.cache, cache_hit[i]))
+        return blocks
+
+    def _acquire(self, name: str, limit: Optional[int]) -> bool:
+        with self._slots:
+            n = self._running.get(name, 0)
+            if limit is not None and n >= limit:
+                return False
+            self._running[name] = n + 1
+            return True
+
+    def _release(self, name: str):
+        # future done callback: the call finished, failed or was cancelled
+        with self._slots:
+            self._running[name] -= 1
+            self._slots.notify_all()
+
+    def _wait_for_slots(self, actions, pending, slot_timeout, waiting, errors):
+        # every slot the blocked actions need is held by calls outside this batch
+        # (timed-out stragglers, other threads): wait for one to be released
+        now = time.monotonic()
+        for i in pending:
+            if i not in waiting and slot_timeout[i] is not None:
+                waiting[i] = now + slot_timeout[i]
+        deadlines = [waiting[i] for i in pending if i in waiting]
+        wait_for = _SLOT_POLL if not deadlines else max(0.0, min(min(deadlines) - now, _SLOT_POLL))
+        with self._slots:
+            self._slots.wait(wait_for)
+        now = time.monotonic()
+        still = deque()
+        for i in pending:
+            d = waiting.get(i)
+            if d is not None and now >= d:
+                errors[i] = FutureTimeout(f"tool {actions[i].name} timed out waiting for a max_concurrency slot")
+                del waiting[i]
+            else:
+                still.append(i)
+        return still
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.use_processes:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        return self._pool
 
-        return block
\ No newline at end of file
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
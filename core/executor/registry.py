@@ -1,17 +1,37 @@
 # =========================================================
 # ===== file: core/executor/registry.py
 # =========================================================
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, Optional
 
 
 class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, Callable[..., Any]] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
 
-    def register(self, name: str, fn: Callable[..., Any]):
+    def register(self, name: str, fn: Callable[..., Any], timeout: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, pure: bool = False,
+                 cache_ttl: Optional[float] = None, cache_max_entries: int = 1024):
+        """
+        timeout: seconds per call in ToolExecutor.execute_many
+        max_concurrency: max calls of this tool in flight at once in execute_many
+        pure: the tool is pure/idempotent, so executors may serve repeated
+              Actions from a memo cache (cache_ttl seconds, cache_max_entries per tool)
+        """
         self._tools[name] = fn
+        self._meta[name] = {
+            "timeout": timeout,
+            "max_concurrency": max_concurrency,
+            "pure": pure,
+            "cache_ttl": cache_ttl,
+            "cache_max_entries": cache_max_entries,
+        }
 
     def get(self, name: str):
         if name not in self._tools:
             raise KeyError(f"Tool not found: {name}")
-        return self._tools[name]
\ No newline at end of file
+        return self._tools[name]
+
+    def meta(self, name: str) -> Dict[str, Any]:
+        self.get(name)
+        return self._meta[name]
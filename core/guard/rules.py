@@ -1,25 +1,58 @@
 # core/guard/rules.py
-from core.guard.state_guard import GuardViolation
-from core.state.view import effective_type_count
+from core.guard.state_guard import GuardViolation, depends_on
+from core.state.view import effective_type_count, short_type_count
 
 def max_steps(limit: int):
     def rule(state):
         if state.counter > limit:
             raise GuardViolation("MAX_STEPS", f"state steps exceeded: {state.counter} > {limit}", {"steps": state.counter, "limit": limit})
     rule.__name__ = f"max_steps({limit})"
-    return rule
+    return depends_on(rule, metric=lambda state: state.counter, limit=limit)
 
 def deny_block_types(deny: set):
+    deny_order = sorted(deny)
+
     def rule(state):
-        for b in state.short_history:
-            if b.block_type in deny:
-                raise GuardViolation("DENY_BLOCK_TYPE", f"denied block_type: {b.block_type}", {"block_type": b.block_type, "deny": list(deny)})
+        for t in deny_order:
+            if short_type_count(state, t):
+                raise GuardViolation("DENY_BLOCK_TYPE", f"denied block_type: {t}", {"block_type": t, "deny": list(deny)})
     rule.__name__ = f"deny_block_types({','.join(sorted(list(deny)))})"
-    return rule
+    return depends_on(rule, types=deny)
 def max_event_count(limit: int, event_type: str = "event"):
     def rule(state):
         count = effective_type_count(state, event_type)
         if count > limit:
             raise GuardViolation("MAX_EVENT_COUNT", f"{event_type} count overflow: {count} > {limit}", {"event_type": event_type, "count": count, "limit": limit})
     rule.__name__ = f"max_event_count({event_type},{limit})"
-    return rule
\ No newline at end of file
+    return depends_on(rule, types={event_type}, metric=lambda state: effective_type_count(state, event_type), limit=limit)
+
+
+# ---- pre-admission rules: rule(state, block), evaluated before the update ----
+
+def pre_deny_block_types(deny: set):
+    def rule(state, block):
+        if block.block_type in deny:
+            raise GuardViolation("DENY_BLOCK_TYPE", f"denied block_type: {block.block_type}", {"block_type": block.block_type, "deny": list(deny), "phase": "pre"})
+    rule.__name__ = f"pre_deny_block_types({','.join(sorted(list(deny)))})"
+    return depends_on(rule, types=deny)
+
+def _admitted_steps(state, block):
+    # steps after admitting block (a dedup hit does not add a step)
+    return state.counter + (0 if state.seen(block.block_id) else 1)
+
+def pre_max_steps(limit: int):
+    def rule(state, block):
+        steps = _admitted_steps(state, block)
+        if steps > limit:
+            raise GuardViolation("MAX_STEPS", f"state steps would exceed: {steps} > {limit}", {"steps": steps, "limit": limit, "phase": "pre"})
+    rule.__name__ = f"pre_max_steps({limit})"
+    # counter + 1 <= limit can never fail, so only hash the block id near the limit
+    return depends_on(rule, metric=lambda state, block: state.counter + 1, limit=limit)
+
+def pre_max_event_count(limit: int, event_type: str = "event"):
+    def rule(state, block):
+        count = effective_type_count(state, event_type) + (0 if state.seen(block.block_id) else 1)
+        if count > limit:
+            raise GuardViolation("MAX_EVENT_COUNT", f"{event_type} count would overflow: {count} > {limit}", {"event_type": event_type, "count": count, "limit": limit, "phase": "pre"})
+    rule.__name__ = f"pre_max_event_count({event_type},{limit})"
+    return depends_on(rule, types={event_type}, metric=lambda state, block: effective_type_count(state, event_type) + 1, limit=limit)
@@ -1,6 +1,6 @@
 # core/guard/state_guard.py
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 @dataclass
 class GuardViolation(Exception):
@@ -11,25 +11,207 @@ class GuardViolation(Exception):
     def __str__(self):
         return f"[{self.code}] {self.message} meta={self.meta or {}}"
 
+    def __reduce__(self):
+        # dataclass __init__ doesn't set Exception.args; keep it picklable across processes
+        return (self.__class__, (self.code, self.message, self.meta))
+
 
 GuardRule = Callable[[Any], None]
+
+
+def depends_on(rule: GuardRule, *, types: Optional[Iterable[str]] = None,
+               metric: Optional[Callable[[Any], float]] = None, limit: Optional[float] = None) -> GuardRule:
+    """
+    Declare what a rule depends on so StateGuard can skip it:
+    - types: only evaluate when the incoming block has one of these block_types
+    - metric/limit: the rule can only fail when metric(state) > limit
+      (metric(state, block) for pre-admission rules), so the guard compares
+      the number and calls the rule only on overflow
+    Rules without declarations are global and run on every check.
+    """
+    rule.guard_types = frozenset(types) if types is not None else None
+    rule.guard_metric = metric
+    rule.guard_limit = limit
+    return rule
+
+
+# compiled entry: (name, rule, metric, limit)
+_Entry = Tuple[str, GuardRule, Optional[Callable[[Any], float]], Optional[float]]
+
+
+class _RuleTable:
+    """
+    Rules compiled into a per-block_type dispatch table.
+    One plan per type some rule watches (bounded by the rules, not by the
+    types seen); every other type gets the global rules only. A set of types
+    gets the union of its per-type plans.
+    """
+
+    def __init__(self, rules: Iterable[GuardRule]):
+        self.entries: List[_Entry] = []
+        untyped: List[int] = []
+        watched: Dict[str, List[int]] = {}
+        for i, rule in enumerate(rules):
+            name = getattr(rule, "__name__", rule.__class__.__name__)
+            self.entries.append((name, rule, getattr(rule, "guard_metric", None), getattr(rule, "guard_limit", None)))
+            types = getattr(rule, "guard_types", None)
+            if types is None:
+                untyped.append(i)
+            else:
+                for t in types:
+                    watched.setdefault(t, []).append(i)
+        self.base: List[_Entry] = [self.entries[i] for i in untyped]
+        # type -> rule indexes, in declaration order so the same rule fails first
+        self.index: Dict[str, List[int]] = {t: sorted(untyped + idx) for t, idx in watched.items()}
+        self.by_type: Dict[str, List[_Entry]] = {t: [self.entries[i] for i in idx] for t, idx in self.index.items()}
+
+    def plan(self, types) -> List[_Entry]:
+        if types is None:
+            return self.entries
+        if isinstance(types, str):
+            return self.by_type.get(types, self.base)
+        hits = [t for t in types if t in self.index]
+        if not hits:
+            return self.base
+        if len(hits) == 1:
+            return self.by_type[hits[0]]
+        idx = set()
+        for t in hits:
+            idx.update(self.index[t])
+        return [self.entries[i] for i in sorted(idx)]
+
+
+class _RuleList(list):
+    """
+    Plain list of rules that drops its guard's compiled table on any in-place
+    change (append, extend, item assignment, ...), so the next check recompiles.
+    Pickles as a plain list; StateGuard rewraps it.
+    """
+
+    def __init__(self, rules: Iterable, on_change: Callable[[], None]):
+        super().__init__(rules)
+        self._on_change = on_change
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def _notifying(name: str):
+    base = getattr(list, name)
+
+    def method(self, *args, **kwargs):
+        out = base(self, *args, **kwargs)
+        self._on_change()
+        return out
+    method.__name__ = name
+    return method
+
+
+for _name in ("append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+              "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(_RuleList, _name, _notifying(_name))
+
+
 class StateGuard:
-    def __init__(self, rules: Optional[List[GuardRule]] = None):
+    """
+    Two rule phases:
+    - pre_rules: rule(state, block), run by admit() before the update; a rejection
+      never touches the state (no transaction, no snapshot)
+    - rules: rule(state), run by check() after the update; violations roll back
+    Rules are compiled into a per-block_type dispatch table: only global rules plus
+    the rules watching the incoming block's type are evaluated. rules/pre_rules are
+    lists: assigning them or changing them in place recompiles on the next check.
+    trace=False skips building the checked/passed trace (admit()/check() return None).
+    """
+
+    def __init__(self, rules: Optional[List[GuardRule]] = None, trace: bool = True,
+                 pre_rules: Optional[List[Callable[[Any, Any], None]]] = None):
         self.rules = rules or []
+        self.pre_rules = pre_rules or []
+        self.trace = trace
+
+    @property
+    def rules(self) -> List[GuardRule]:
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules: Iterable[GuardRule]):
+        self._rules = _RuleList(rules, self._drop_post)
+        self._post = None
+
+    @property
+    def pre_rules(self) -> List[Callable[[Any, Any], None]]:
+        return self._pre_rules
+
+    @pre_rules.setter
+    def pre_rules(self, rules: Iterable[Callable[[Any, Any], None]]):
+        self._pre_rules = _RuleList(rules, self._drop_pre)
+        self._pre = None
+
+    def _drop_post(self):
+        self._post = None
+
+    def _drop_pre(self):
+        self._pre = None
+
+    def __getstate__(self):
+        st = self.__dict__.copy()
+        st["_post"] = st["_pre"] = None
+        return st
+
+    def __setstate__(self, st):
+        self.__dict__.update(st)
+        self.rules = st["_rules"]
+        self.pre_rules = st["_pre_rules"]
 
     def add_rule(self, rule: GuardRule):
         self.rules.append(rule)
 
-    def check(self, state) -> Dict[str, Any]:
+    def add_pre_rule(self, rule: Callable[[Any, Any], None]):
+        self.pre_rules.append(rule)
+
+    def compile(self):
+        self._post = _RuleTable(self._rules)
+        self._pre = _RuleTable(self._pre_rules)
+        return self
+
+    @property
+    def has_pre_rules(self) -> bool:
+        return bool(self.pre_rules)
+
+    def admit(self, state, block) -> Optional[Dict[str, Any]]:
+        """
+        Pre-admission phase: evaluate pre_rules against (state, block) before any mutation.
+        """
+        if self._pre is None:
+            self._pre = _RuleTable(self._pre_rules)
+        return self._run(self._pre.plan(block.block_type), (state, block))
+
+    def check(self, state, block=None, types: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        block / types select the rules to run; with neither, every rule runs.
+        """
+        if self._post is None:
+            self._post = _RuleTable(self._rules)
+        if block is not None:
+            types = block.block_type
+        return self._run(self._post.plan(types), (state,))
+
+    def _run(self, plan: List[_Entry], args) -> Optional[Dict[str, Any]]:
+        if not self.trace:
+            for name, rule, metric, limit in plan:
+                if metric is None or metric(*args) > limit:
+                    rule(*args)
+            return None
+
         trace = {"checked": [], "passed": [], "failed": None}
-        for rule in self.rules:
-            name = getattr(rule, "__name__", rule.__class__.__name__)
+        for name, rule, metric, limit in plan:
             trace["checked"].append(name)
             try:
-                rule(state)
+                if metric is None or metric(*args) > limit:
+                    rule(*args)
                 trace["passed"].append(name)
             except GuardViolation as e:
                 trace["failed"] = {"rule": name, "code": e.code, "message": e.message, "meta": e.meta or {}}
                 raise
         return trace
-
@@ -2,33 +2,103 @@
 # ===== file: core/infer/block.py
 # =========================================================
 import hashlib
+import sys
 import time
-from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Dict, Optional
+
+# block_id hash: "sha256" (default, stable across versions) or "blake2b" (faster, 8-byte digest)
+ID_HASHES = ("sha256", "blake2b")
+_id_hash = "sha256"
+
+
+def set_id_hash(name: str) -> None:
+    global _id_hash
+    if name not in ID_HASHES:
+        raise ValueError(f"unknown block id hash: {name} (choose from {ID_HASHES})")
+    _id_hash = name
 
 
 def _stable_hash(s: str) -> str:
+    if _id_hash == "blake2b":
+        return hashlib.blake2b(s.encode("utf-8"), digest_size=8).hexdigest()
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:16]
 
 
-@dataclass
 class Block:
     """
     A non-token unit. Could be:
     - raw text segment
     - event
     - structured dict
+
+    Slotted and lazy: block_id, the encoded byte size and the audit fingerprint
+    are computed on first access and cached, so content is treated as immutable
+    once the block exists. block_id depends on the process-wide set_id_hash(), so
+    pickling resolves it first: a worker process never re-hashes with its own setting.
     """
-    content: Any
-    block_type: str = "event"
-    ts: float = field(default_factory=lambda: time.time())
-    block_id: Optional[str] = None  # idempotency key
 
-    def __post_init__(self):
-        if self.block_id is None:
+    __slots__ = ("content", "block_type", "ts", "_block_id", "_nbytes", "_fp")
+
+    def __init__(self, content: Any, block_type: str = "event", ts: Optional[float] = None, block_id: Optional[str] = None):
+        self.content = content
+        self.block_type = sys.intern(block_type) if type(block_type) is str else block_type
+        self.ts = time.time() if ts is None else ts
+        self._block_id = block_id  # idempotency key
+        self._nbytes: Optional[int] = None
+        self._fp: Optional[Dict[str, Any]] = None
+
+    @property
+    def block_id(self) -> str:
+        if self._block_id is None:
             # Use content+type for stable id. For dict, use repr() (deterministic enough for v0.2)
-            raw = f"{self.block_type}:{repr(self.content)}"
-            self.block_id = _stable_hash(raw)
+            self._block_id = _stable_hash(f"{self.block_type}:{self.content!r}")
+        return self._block_id
+
+    @block_id.setter
+    def block_id(self, value: Optional[str]):
+        self._block_id = value
+
+    def _payload(self) -> str:
+        c = self.content
+        return c if isinstance(c, str) else repr(c)
+
+    @property
+    def nbytes(self) -> int:
+        """UTF-8 size of the content (repr() for non-str, 0 for None), as counted by CostCounter.add_bytes."""
+        if self._nbytes is None:
+            if self.content is None:
+                self._nbytes = 0
+                return 0
+            s = self._payload()
+            self._nbytes = len(s) if s.isascii() else len(s.encode("utf-8"))
+        return self._nbytes
+
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        """Same shape as core.audit.logger.fingerprint(content)."""
+        if self._fp is None:
+            b = self._payload().encode("utf-8")
+            if self.content is not None:
+                self._nbytes = len(b)
+            self._fp = {"len": len(b), "sha256_8": hashlib.sha256(b).hexdigest()[:8]}
+        return self._fp
+
+    def __getstate__(self):
+        return (self.content, self.block_type, self.ts, self.block_id)
+
+    def __setstate__(self, st):
+        self.content, block_type, self.ts, self._block_id = st
+        self.block_type = sys.intern(block_type) if type(block_type) is str else block_type
+        self._nbytes = None
+        self._fp = None
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.content, self.block_type, self.ts, self.block_id) == (
+            other.content, other.block_type, other.ts, other.block_id)
+
+    __hash__ = None
 
     def __repr__(self):
         return f"<Block type={self.block_type} id={self.block_id} content={self.content!r}>"
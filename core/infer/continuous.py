@@ -1,57 +1,86 @@
 # core/infer/continuous.py
 
-from typing import List, Optional
+from typing import BinaryIO, Iterator, List, Optional, Union
 from core.infer.block import Block
 
+Data = Union[str, bytes, bytearray, memoryview]
+
+# compact the consumed prefix once it is at least this large (and half the buffer)
+_COMPACT_MIN = 64 * 1024
+
 
 class ContinuousBuffer:
     """
     Non-token continuous buffer.
     - delimiter mode: emits blocks split by delimiter
-    - chunk_size mode: fixed-size chunks
+    - chunk_size mode: fixed-size chunks (in bytes, aligned down to a UTF-8 character boundary)
+
+    Data is kept in a bytearray; the delimiter scan resumes where the last one
+    stopped and only the emitted ranges are decoded (through memoryview slices),
+    so appending large bursts stays linear.
     """
 
-    def __init__(self, *, delimiter: Optional[str] = "\n", chunk_size: Optional[int] = None, block_type: str = "event"):
+    def __init__(
+        self,
+        *,
+        delimiter: Optional[str] = "\n",
+        chunk_size: Optional[int] = None,
+        block_type: str = "event",
+        encoding: str = "utf-8",
+    ):
         if delimiter is None and chunk_size is None:
             raise ValueError("Either delimiter or chunk_size must be provided.")
         if delimiter is not None and chunk_size is not None:
             raise ValueError("Choose delimiter OR chunk_size, not both.")
+        if delimiter == "":
+            raise ValueError("delimiter must not be empty.")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
         self.delimiter = delimiter
         self.chunk_size = chunk_size
         self.block_type = block_type
-        self._buf: str = ""
+        self.encoding = encoding
+        self._delim: Optional[bytes] = delimiter.encode(encoding) if delimiter is not None else None
+        self._buf = bytearray()
+        self._start: int = 0  # first byte not yet emitted
+        self._scan: int = 0   # delimiter search resumes here
         self._emitted_count: int = 0
 
-    def append(self, data: str) -> None:
-        if not isinstance(data, str):
-            raise TypeError("ContinuousBuffer expects str input.")
-        self._buf += data
+    def append(self, data: Data) -> None:
+        if isinstance(data, str):
+            self._buf += data.encode(self.encoding)
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            self._buf += data
+        else:
+            raise TypeError("ContinuousBuffer expects str or bytes-like input.")
 
-    def emit_blocks(self) -> List[Block]:
-        blocks: List[Block] = []
+    def feed(self, data: Data) -> Iterator[Block]:
+        """
+        Append data and return an iterator over the blocks it completes.
+        """
+        self.append(data)
+        return self._iter_blocks()
 
-        if self.delimiter is not None:
-            parts = self._buf.split(self.delimiter)
-            complete, tail = parts[:-1], parts[-1]
-            for p in complete:
-                p = p.strip()
-                if p:
-                    blocks.append(Block(p, block_type=self.block_type))
-            self._buf = tail
-        else:
-            while len(self._buf) >= self.chunk_size:
-                chunk = self._buf[: self.chunk_size]
-                self._buf = self._buf[self.chunk_size :]
-                chunk = chunk.strip()
-                if chunk:
-                    blocks.append(Block(chunk, block_type=self.block_type))
+    def iter_stream(self, stream: BinaryIO, read_size: int = 64 * 1024) -> Iterator[Block]:
+        """
+        Read a binary stream (file, pipe, socket.makefile("rb")) to EOF, yielding blocks
+        as they complete; the tail is flushed at EOF.
+        """
+        while True:
+            data = stream.read(read_size)
+            if not data:
+                break
+            yield from self.feed(data)
+        yield from self.flush()
 
-        self._emitted_count += len(blocks)
-        return blocks
+    def emit_blocks(self) -> List[Block]:
+        return list(self._iter_blocks())
 
     def flush(self) -> List[Block]:
-        tail = self._buf.strip()
-        self._buf = ""
+        tail = self._decode(self._start, len(self._buf)).strip()
+        self._buf = bytearray()
+        self._start = 0
+        self._scan = 0
         if tail:
             self._emitted_count += 1
             return [Block(tail, block_type=self.block_type)]
@@ -60,3 +89,63 @@ class ContinuousBuffer:
     @property
     def emitted_count(self) -> int:
         return self._emitted_count
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buf) - self._start
+
+    # ---- internals ----
+    def _decode(self, a: int, b: int) -> str:
+        with memoryview(self._buf) as mv:
+            return str(mv[a:b], self.encoding)
+
+    def _iter_blocks(self) -> Iterator[Block]:
+        if self._delim is not None:
+            delim = self._delim
+            dlen = len(delim)
+            while True:
+                i = self._buf.find(delim, max(self._scan, self._start))
+                if i < 0:
+                    # a delimiter may straddle the end of what we have so far
+                    self._scan = max(self._start, len(self._buf) - dlen + 1)
+                    break
+                a = self._start
+                self._start = self._scan = i + dlen
+                p = self._decode(a, i).strip()
+                if p:
+                    self._emitted_count += 1
+                    yield Block(p, block_type=self.block_type)
+        else:
+            while len(self._buf) - self._start >= self.chunk_size:
+                a = self._start
+                b = self._char_boundary(a + self.chunk_size)
+                if b <= a:
+                    # chunk_size is smaller than one character: take the whole character
+                    b = a + self.chunk_size
+                    while b < len(self._buf) and (self._buf[b] & 0xC0) == 0x80:
+                        b += 1
+                self._start = b
+                chunk = self._decode(a, b).strip()
+                if chunk:
+                    self._emitted_count += 1
+                    yield Block(chunk, block_type=self.block_type)
+        self._compact()
+
+    def _char_boundary(self, pos: int) -> int:
+        # step back over UTF-8 continuation bytes (0b10xxxxxx)
+        if self.encoding.replace("-", "").lower() != "utf8":
+            return pos
+        buf = self._buf
+        while pos > self._start and pos < len(buf) and (buf[pos] & 0xC0) == 0x80:
+            pos -= 1
+        return pos
+
+    def _compact(self) -> None:
+        start = self._start
+        if start and start == len(self._buf):
+            self._buf.clear()
+            self._scan = self._start = 0
+        elif start >= _COMPACT_MIN and start * 2 >= len(self._buf):
+            del self._buf[:start]
+            self._scan -= start
+            self._start = 0
@@ -22,5 +22,9 @@ class CostCounter:
         else:
             self.bytes_in += len(repr(payload).encode("utf-8"))
 
+    def add_block(self, block):
+        # Block caches its encoded size, so repeated accounting is free
+        self.bytes_in += block.nbytes
+
     def summary(self):
         return {"operations": self.operations, "bytes_in": self.bytes_in}
@@ -0,0 +1,116 @@
+# core/infer/file_source.py
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple
+from core.infer.block import Block
+
+
+class MmapFileSource:
+    """
+    Lazy block source over a memory-mapped file (for multi-GB event logs).
+    - delimiter mode / chunk_size mode, same semantics as ContinuousBuffer
+    - reads only [start, end); `offset` is the byte position after the last
+      yielded block, so MmapFileSource(path, start=offset) resumes from a checkpoint
+    - emit_tail=False: a trailing segment with no delimiter after it (or a final
+      chunk shorter than chunk_size) is held back and `offset` stops before it, so
+      a file still being appended to is resumed without a split record
+    - split_ranges() cuts a file into delimiter-aligned ranges for parallel workers
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        delimiter: Optional[str] = "\n",
+        chunk_size: Optional[int] = None,
+        block_type: str = "event",
+        encoding: str = "utf-8",
+        start: int = 0,
+        end: Optional[int] = None,
+        emit_tail: bool = True,
+    ):
+        if delimiter is None and chunk_size is None:
+            raise ValueError("Either delimiter or chunk_size must be provided.")
+        if delimiter is not None and chunk_size is not None:
+            raise ValueError("Choose delimiter OR chunk_size, not both.")
+        if delimiter == "":
+            raise ValueError("delimiter must not be empty.")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+        self.path = path
+        self.delimiter = delimiter
+        self.chunk_size = chunk_size
+        self.block_type = block_type
+        self.encoding = encoding
+        self.start = start
+        self.end = end
+        self.emit_tail = emit_tail
+        self.offset = start
+
+    def __iter__(self) -> Iterator[Block]:
+        size = os.path.getsize(self.path)
+        end = size if self.end is None else min(self.end, size)
+        self.offset = pos = self.start
+        if pos >= end:
+            return
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as mv:
+                if self.delimiter is not None:
+                    delim = self.delimiter.encode(self.encoding)
+                    while pos < end:
+                        i = mm.find(delim, pos, end)
+                        if i < 0 and not self.emit_tail:
+                            return
+                        nxt = end if i < 0 else i + len(delim)
+                        text = str(mv[pos:(end if i < 0 else i)], self.encoding).strip()
+                        pos = self.offset = nxt
+                        if text:
+                            yield Block(text, block_type=self.block_type)
+                else:
+                    while pos < end:
+                        if pos + self.chunk_size > end and not self.emit_tail:
+                            return
+                        nxt = self._char_boundary(mm, pos, min(pos + self.chunk_size, end), end)
+                        text = str(mv[pos:nxt], self.encoding).strip()
+                        pos = self.offset = nxt
+                        if text:
+                            yield Block(text, block_type=self.block_type)
+
+    def _char_boundary(self, mm, lo: int, pos: int, end: int) -> int:
+        if self.encoding.replace("-", "").lower() != "utf8" or pos >= end:
+            return pos
+        b = pos
+        while b > lo and (mm[b] & 0xC0) == 0x80:
+            b -= 1
+        if b > lo:
+            return b
+        # chunk_size is smaller than one character: take the whole character
+        while pos < end and (mm[pos] & 0xC0) == 0x80:
+            pos += 1
+        return pos
+
+    @staticmethod
+    def split_ranges(path: str, parts: int, delimiter: str = "\n", encoding: str = "utf-8") -> List[Tuple[int, int]]:
+        """
+        Split a file into at most `parts` byte ranges that start right after a delimiter.
+        Each range can be read independently: MmapFileSource(path, start=a, end=b).
+        """
+        size = os.path.getsize(path)
+        if size == 0 or parts <= 1:
+            return [(0, size)]
+        delim = delimiter.encode(encoding)
+        bounds = [0]
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for k in range(1, parts):
+                # start a little early so a delimiter straddling the target is found
+                target = max(size * k // parts - len(delim) + 1, bounds[-1])
+                i = mm.find(delim, target)
+                b = size if i < 0 else i + len(delim)
+                if b > bounds[-1]:
+                    bounds.append(b)
+                if b >= size:
+                    break
+        if bounds[-1] < size:
+            bounds.append(size)
+        return list(zip(bounds[:-1], bounds[1:]))
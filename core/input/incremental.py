@@ -1,12 +1,57 @@
 # core/infer/incremental.py
+import inspect
+
 from core.state.state_delta import StateDelta
-from core.audit.logger import fingerprint
-def incremental_update(state, block, cost, guard=None, verifier=None, audit_logger=None):
-    before = state.snapshot()
 
+
+# guard class -> whether its check() takes (state, block, types=...); older and
+# duck-typed guards only have check(state), which then runs every rule
+_CHECK_SELECTS = {}
+
+
+def _check(guard, state, block=None, types=None):
+    selects = _CHECK_SELECTS.get(type(guard))
+    if selects is None:
+        try:
+            params = inspect.signature(guard.check).parameters
+            selects = "types" in params or any(p.kind == p.VAR_KEYWORD for p in params.values())
+        except (TypeError, ValueError):
+            selects = False
+        _CHECK_SELECTS[type(guard)] = selects
+    if not selects:
+        return guard.check(state)
+    return guard.check(state, block, types=types)
+
+
+def _has_pre_rules(guard) -> bool:
+    return guard is not None and getattr(guard, "has_pre_rules", False)
+
+
+def _admit(state, block, guard, cost, audit_logger):
+    # pre-admission guard phase: rejects before any state mutation
+    try:
+        guard.admit(state, block)
+    except Exception as e:
+        if audit_logger:
+            audit_logger.emit("consume_rejected", lambda: {
+                "block": {"type": block.block_type, "id": block.block_id, "fp": block.fingerprint},
+                "error": str(e),
+                "cost": cost.summary(),
+            })
+        raise
+
+
+def incremental_update(state, block, cost, guard=None, verifier=None, audit_logger=None):
     # cost: always count an attempted operation + input bytes
     cost.add_ops(1)
-    cost.add_bytes(block.content)
+    cost.add_block(block)
+
+    if _has_pre_rules(guard):
+        _admit(state, block, guard, cost, audit_logger)
+
+    # undo-log transaction: rollback only reverts what this block touched
+    before_counter = state.counter
+    state.begin()
 
     compress_trace = None
     try:
@@ -14,14 +59,16 @@ def incremental_update(state, block, cost, guard=None, verifier=None, audit_logg
         compress_trace = state.update(block)
 
         # guard checks (post-update)
-        guard_trace = guard.check(state) if guard else None
+        guard_trace = _check(guard, state, block) if guard else None
 
         # invariants verification
         if verifier:
             verifier.verify(state)
+        delta = StateDelta.from_counters(before_counter, state.counter)
+        # audit payloads are lambdas: only built if the logger keeps the event
             # audit compression
         if audit_logger and isinstance(compress_trace, dict) and compress_trace.get("type") == "compress":
-            audit_logger.emit("compress", {
+            audit_logger.emit("compress", lambda: {
                 "trace": compress_trace,
                 "state": state.summary(),
                 "cost": cost.summary(),
@@ -29,24 +76,153 @@ def incremental_update(state, block, cost, guard=None, verifier=None, audit_logg
 
             # audit OK
         if audit_logger:
-            audit_logger.emit("consume_ok", {
-                "block": {"type": block.block_type, "id": block.block_id, "fp": fingerprint(block.content)},
+            audit_logger.emit("consume_ok", lambda: {
+                "block": {"type": block.block_type, "id": block.block_id, "fp": block.fingerprint},
                 "guard_trace": guard_trace,
                 "compress_trace": compress_trace,
-                "delta": StateDelta(before, state).summary(),
+                "delta": delta.summary(),
                 "state_after": state.summary(),
                 "cost": cost.summary(),
             })
-        return state, StateDelta(before, state), guard_trace
+        state.commit()
+        return state, delta, guard_trace
 
     except Exception as e:
         # rollback on any failure
-        state.rollback(before)
+        state.abort()
         if audit_logger:
-            audit_logger.emit("consume_violation", {
-                "block": {"type": block.block_type, "id": block.block_id, "fp": fingerprint(block.content)},
+            audit_logger.emit("consume_violation", lambda: {
+                "block": {"type": block.block_type, "id": block.block_id, "fp": block.fingerprint},
                 "error": str(e),
                 "state_after_rollback": state.summary(),
                 "cost": cost.summary(),
             })
-        raise
\ No newline at end of file
+        raise
+
+
+def _batch_summary(blocks):
+    types = {}
+    for b in blocks:
+        types[b.block_type] = types.get(b.block_type, 0) + 1
+    return {"size": len(blocks), "types": types, "ids": [b.block_id for b in blocks]}
+
+
+def _will_compress(state, block) -> bool:
+    # update(block) will fold short_history into the core (resetting the short-history views)
+    return not state.seen(block.block_id) and len(state.short_history) + 1 >= state.max_history
+
+
+def incremental_update_many(state, blocks, cost, guard=None, verifier=None, audit_logger=None, partial=False):
+    """
+    Batched incremental_update: one transaction, one guard/verify pass and one
+    aggregated audit record per batch.
+    - partial=False: all-or-nothing; any failure rolls back the whole batch and re-raises
+    - partial=True: on failure the batch is replayed block by block; failing blocks are
+      rolled back individually and reported in trace["rejected"], the rest are committed
+    Pre-admission rules run just before each block's update, so they see the blocks
+    admitted earlier in the batch. Type-scoped post rules also run before each
+    compression inside the batch (it resets the short-history views), so a batch
+    rejects the same blocks as sequential consume() calls.
+    """
+    blocks = list(blocks)
+    before_counter = state.counter
+
+    # cost: always count attempted operations + input bytes
+    for block in blocks:
+        cost.add_ops(1)
+        cost.add_block(block)
+
+    pre = _has_pre_rules(guard)
+    rejected = []
+    compress_traces = []
+    phase = "post"
+    state.begin()
+    try:
+        types = set()
+        pending = set()  # types added since the last compression
+        for i, block in enumerate(blocks):
+            if pre:
+                try:
+                    guard.admit(state, block)
+                except Exception as e:
+                    if not partial:
+                        phase = "pre"
+                        raise
+                    rejected.append({"index": i, "id": block.block_id, "type": block.block_type, "error": str(e)})
+                    continue
+            if guard is not None and pending and _will_compress(state, block):
+                _check(guard, state, types=pending)
+                pending = set()
+            compress_trace = state.update(block)
+            types.add(block.block_type)
+            pending.add(block.block_type)
+            if isinstance(compress_trace, dict) and compress_trace.get("type") == "compress":
+                compress_traces.append(compress_trace)
+
+        # guard + invariants once per batch
+        guard_trace = _check(guard, state, types=types) if guard else None
+        if verifier:
+            verifier.verify(state)
+
+    except Exception as e:
+        state.abort()
+        if not partial:
+            if audit_logger:
+                audit_logger.emit("consume_batch_violation", lambda: {
+                    "batch": _batch_summary(blocks),
+                    "phase": phase,
+                    "error": str(e),
+                    "state_after_rollback": state.summary(),
+                    "cost": cost.summary(),
+                })
+            raise
+
+        # partial commit: replay with per-block checks
+        rejected = []
+        compress_traces = []
+        guard_trace = None
+        for i, block in enumerate(blocks):
+            if pre:
+                try:
+                    guard.admit(state, block)
+                except Exception as be:
+                    rejected.append({"index": i, "id": block.block_id, "type": block.block_type, "error": str(be)})
+                    continue
+            state.begin()
+            try:
+                compress_trace = state.update(block)
+                block_guard_trace = _check(guard, state, block) if guard else None
+                if verifier:
+                    verifier.verify(state)
+            except Exception as be:
+                state.abort()
+                rejected.append({"index": i, "id": block.block_id, "type": block.block_type, "error": str(be)})
+                continue
+            state.commit()
+            guard_trace = block_guard_trace
+            if isinstance(compress_trace, dict) and compress_trace.get("type") == "compress":
+                compress_traces.append(compress_trace)
+    else:
+        state.commit()
+
+    delta = StateDelta.from_counters(before_counter, state.counter)
+    trace = {
+        "size": len(blocks),
+        "accepted": len(blocks) - len(rejected),
+        "rejected": rejected,
+        "guard_trace": guard_trace,
+        "compress_traces": compress_traces,
+    }
+
+    if audit_logger:
+        audit_logger.emit("consume_batch_ok", lambda: {
+            "batch": _batch_summary(blocks),
+            "accepted": trace["accepted"],
+            "rejected": rejected,
+            "guard_trace": guard_trace,
+            "compress_count": len(compress_traces),
+            "delta": delta.summary(),
+            "state_after": state.summary(),
+            "cost": cost.summary(),
+        })
+    return state, delta, trace
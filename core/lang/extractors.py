@@ -0,0 +1,55 @@
+# =========================================================
+# ===== file: core/lang/extractors.py
+# =========================================================
+"""
+Slot extractors for the intent table (core/lang/schema.py).
+An extractor is any callable text -> value (None = slot not found);
+the factories below precompile their pattern once and stay picklable, so
+tables can be shipped to RuleSLU worker processes.
+"""
+import re
+from typing import Callable, Optional, Sequence
+
+
+class RegexSlot:
+    """First match of pattern; returns the given group (index or name). Picklable."""
+
+    __slots__ = ("rx", "group", "strip")
+
+    def __init__(self, pattern: str, group=1, flags: int = re.I, strip: bool = True):
+        self.rx = re.compile(pattern, flags)
+        self.group = group
+        self.strip = strip
+
+    def __call__(self, text: str) -> Optional[str]:
+        m = self.rx.search(text)
+        if not m:
+            return None
+        v = m.group(self.group)
+        return v.strip() if self.strip and v is not None else v
+
+    def __getstate__(self):
+        return (self.rx, self.group, self.strip)
+
+    def __setstate__(self, st):
+        self.rx, self.group, self.strip = st
+
+    def __repr__(self):
+        return f"RegexSlot({self.rx.pattern!r}, group={self.group!r})"
+
+
+def regex_slot(pattern: str, group=1, flags: int = re.I, strip: bool = True) -> Callable[[str], Optional[str]]:
+    return RegexSlot(pattern, group=group, flags=flags, strip=strip)
+
+
+def after_keyword(keywords: Sequence[str], value: str = r".+", sep: str = r"\s+",
+                  flags: int = re.I) -> Callable[[str], Optional[str]]:
+    """Text following any of keywords, e.g. after_keyword(["buy"]) on "buy milk" -> "milk"."""
+    alt = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return regex_slot(rf"(?:{alt}){sep}(?P<v>{value})", group="v", flags=flags)
+
+
+def id_after(keywords: Sequence[str], id_chars: str = r"[A-Za-z0-9_-]+",
+             flags: int = re.I) -> Callable[[str], Optional[str]]:
+    """Identifier after a keyword and an optional '#', e.g. "order #A1024" -> "A1024"."""
+    return after_keyword(keywords, value=id_chars, sep=r"\s*#?\s*", flags=flags)
@@ -0,0 +1,143 @@
+# =========================================================
+# ===== file: core/lang/schema.py
+# =========================================================
+"""
+Declarative intent table for RuleSLU.
+
+Each Intent has trigger keywords (literal, case-insensitive) and/or trigger
+regex patterns, plus slot extractors (core/lang/extractors.py). IntentTable
+compiles every trigger of every intent into ONE regex:
+- all keywords go into a single trie-shaped alternation (shared prefixes, so
+  matching cost does not grow linearly with the number of keywords), then a
+  dict maps the matched keyword back to its intents (re.I folds a few more
+  characters than str.lower(), e.g. "ſ" ~ "s"; such spellings are resolved
+  by fullmatch against the keywords once and remembered)
+- regex triggers become named groups of the same alternation
+One scan over the text finds every intent that triggers; the first one in
+table order wins (table order = priority), and only its slot extractors run.
+The scan reports one trigger per position (the longest keyword, else the
+first regex trigger), so the others starting there are resolved at that hit:
+keywords that are prefixes of the matched one come from a precomputed
+table, and regex triggers of higher-priority intents are re-tried at the
+same position.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    keywords: Sequence[str] = ()
+    patterns: Sequence[str] = ()
+    slots: Dict[str, Callable[[str], Any]] = field(default_factory=dict)
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # optional tail is greedy, so the longest keyword wins
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class IntentTable:
+    """
+    Compiled intent table (see module docstring).
+    match(text) -> (intent name, slots dict); fallback intent with no slots if nothing triggers.
+    """
+
+    def __init__(self, intents: Sequence[Intent], fallback: str = "unknown", flags: int = re.I):
+        self.intents: List[Intent] = list(intents)
+        self.fallback = fallback
+        self.flags = flags
+        names = [i.name for i in self.intents]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate intent names in IntentTable")
+
+        # keyword (normalized) -> intent indexes, in table order
+        self._kw: Dict[str, Tuple[int, ...]] = {}
+        for idx, intent in enumerate(self.intents):
+            for k in intent.keywords:
+                k = self._norm(k)
+                if idx not in self._kw.get(k, ()):
+                    self._kw[k] = self._kw.get(k, ()) + (idx,)
+
+        # keyword -> highest-priority intent among it and its keyword prefixes
+        # (all of them match wherever the longer keyword matches)
+        self._kw_best: Dict[str, int] = {
+            k: min(self._kw[k[:n]][0] for n in range(1, len(k) + 1) if k[:n] in self._kw)
+            for k in self._kw
+        }
+
+        parts = []
+        if self._kw:
+            parts.append(f"(?P<kw>{_trie_regex(sorted(self._kw))})")
+        self._pattern_groups: Dict[str, int] = {}
+        self._pattern_rx: List[Tuple[int, "re.Pattern"]] = []  # table order
+        for idx, intent in enumerate(self.intents):
+            for j, p in enumerate(intent.patterns):
+                # also fails early with the offending pattern
+                self._pattern_rx.append((idx, re.compile(p, flags)))
+                g = f"p{idx}_{j}"
+                self._pattern_groups[g] = idx
+                # regex triggers must not define their own named groups
+                parts.append(f"(?P<{g}>(?:{p}))")
+        # zero-width lookahead: every start position is tried, nothing is consumed
+        self._rx = re.compile("(?=" + "|".join(parts) + ")", flags) if parts else None
+
+    def _norm(self, s: str) -> str:
+        return s.lower() if self.flags & re.I else s
+
+    def _kw_first(self, matched: str) -> int:
+        key = self._norm(matched)
+        best = self._kw_best.get(key)
+        if best is None:
+            for k in self._kw:
+                if re.fullmatch(re.escape(k), matched, self.flags):
+                    best = self._kw_best[key] = self._kw_best[k]
+                    break
+        return best
+
+    def classify(self, text: str) -> Optional[Intent]:
+        """Highest-priority intent triggered anywhere in text, in one scan."""
+        if self._rx is None:
+            return None
+        best = len(self.intents)
+        for m in self._rx.finditer(text):
+            g = m.lastgroup
+            if g == "kw":
+                idx = self._kw_first(m.group("kw"))
+                # regex triggers of higher-priority intents hidden by the keyword
+                pos = m.start()
+                for pidx, prx in self._pattern_rx:
+                    if pidx >= min(idx, best):
+                        break
+                    if prx.match(text, pos):
+                        idx = pidx
+                        break
+            else:
+                idx = self._pattern_groups[g]
+            if idx < best:
+                best = idx
+                if best == 0:
+                    break
+        return self.intents[best] if best < len(self.intents) else None
+
+    def match(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        intent = self.classify(text)
+        if intent is None:
+            return self.fallback, {}
+        return intent.name, {slot: fn(text) for slot, fn in intent.slots.items()}
@@ -1,34 +1,160 @@
 # =========================================================
 # ===== file: core/lang/slu_rule.py
 # =========================================================
-import re
-from typing import List
+import multiprocessing as mp
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from core.infer.block import Block
+from core.lang.extractors import after_keyword, id_after
+from core.lang.schema import Intent, IntentTable
+
+# table order is priority: cancel wins over create when both trigger
+DEFAULT_INTENTS = [
+    Intent(
+        "cancel_order",
+        keywords=("取消", "撤销", "cancel"),
+        slots={"order_id": id_after(("订单", "order"))},
+    ),
+    Intent(
+        "create_order",
+        keywords=("购买", "下单", "buy", "purchase"),
+        slots={"item": after_keyword(("购买", "buy", "purchase"))},
+    ),
+]
+
+# per worker process: the IntentTable shipped at pool start
+_WORKER_TABLE: Optional[IntentTable] = None
+
+
+def _init_worker(table: IntentTable):
+    global _WORKER_TABLE
+    _WORKER_TABLE = table
+
+
+def _match_chunk(texts: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    return [_WORKER_TABLE.match(t) for t in texts]
 
 
 class RuleSLU:
     """
     Non-token SLU: natural language -> structured intent blocks.
     CPU cheap, auditable.
+    Intents come from a declarative IntentTable (core/lang/schema.py), matched in a single pass.
+    - exact duplicate utterances are served from an LRU of cache_size results (0 = off)
+    - parse_stream/parse_batch handle iterables; with workers > 1 they dispatch
+      chunks of chunk_size unique, uncached texts to a process pool, keeping at
+      most 2 x workers chunks in flight, and yield blocks lazily in input order
+    Call close() (or use as a context manager) to stop the pool.
     """
 
+    def __init__(self, table: Optional[IntentTable] = None, cache_size: int = 4096,
+                 workers: Optional[int] = None, chunk_size: int = 1024, mp_context: Optional[str] = None):
+        self.table = table if table is not None else IntentTable(DEFAULT_INTENTS)
+        self.cache_size = cache_size
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.mp_context = mp_context
+        self._cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._pool = None
+
     def parse(self, text: str) -> List[Block]:
         t = text.strip()
+        hit = self._cached(t)
+        if hit is None:
+            hit = self.table.match(t)
+            self._remember(t, hit)
+        return [self._block(t, hit)]
+
+    def parse_stream(self, texts: Iterable[str]) -> Iterator[Block]:
+        if not self.workers or self.workers <= 1:
+            for text in texts:
+                yield from self.parse(text)
+            return
+
+        pool = self._get_pool()
+        it = iter(texts)
+        inflight = deque()  # (stripped chunk, {text: result} already known, texts sent, future or None)
+        while True:
+            while len(inflight) < 2 * self.workers:
+                chunk = [t.strip() for t in islice(it, self.chunk_size)]
+                if not chunk:
+                    break
+                known: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+                todo: List[str] = []
+                queued = set()
+                for t in chunk:
+                    if t in known or t in queued:
+                        continue
+                    hit = self._cached(t)
+                    if hit is not None:
+                        known[t] = hit
+                    else:
+                        queued.add(t)
+                        todo.append(t)
+                fut = pool.submit(_match_chunk, todo) if todo else None
+                inflight.append((chunk, known, todo, fut))
+            if not inflight:
+                return
+            chunk, known, todo, fut = inflight.popleft()
+            if fut is not None:
+                for t, res in zip(todo, fut.result()):
+                    known[t] = res
+                    self._remember(t, res)
+            for t in chunk:
+                yield self._block(t, known[t])
+
+    def parse_batch(self, texts: Iterable[str]) -> List[Block]:
+        return list(self.parse_stream(texts))
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache)}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
 
-        if re.search(r"(取消|撤销|cancel)", t, re.I):
-            oid = self._extract_order_id(t)
-            return [Block({"intent": "cancel_order", "slots": {"order_id": oid}, "raw": t}, block_type="intent")]
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
-        if re.search(r"(购买|下单|buy|purchase)", t, re.I):
-            item = self._extract_item(t)
-            return [Block({"intent": "create_order", "slots": {"item": item}, "raw": t}, block_type="intent")]
+    # ---- internals ----
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=(self.table,),
+            )
+        return self._pool
 
-        return [Block({"intent": "unknown", "slots": {}, "raw": t}, block_type="intent")]
+    def _block(self, t: str, result: Tuple[str, Dict[str, Any]]) -> Block:
+        intent, slots = result
+        # fresh slots dict per block: cached results are shared
+        return Block({"intent": intent, "slots": dict(slots), "raw": t}, block_type="intent")
 
-    def _extract_order_id(self, t: str):
-        m = re.search(r"(订单|order)\s*#?\s*([A-Za-z0-9_-]+)", t, re.I)
-        return m.group(2) if m else None
+    def _cached(self, t: str):
+        if not self.cache_size:
+            return None
+        hit = self._cache.get(t)
+        if hit is None:
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(t)
+        self.cache_hits += 1
+        return hit
 
-    def _extract_item(self, t: str):
-        m = re.search(r"(购买|buy|purchase)\s+(.+)", t, re.I)
-        return m.group(2).strip() if m else None
\ No newline at end of file
+    def _remember(self, t: str, result):
+        if not self.cache_size:
+            return
+        self._cache[t] = result
+        self._cache.move_to_end(t)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -1,6 +1,8 @@
 # =========================================================
 # ===== file: core/planner/action.py
 # =========================================================
+import hashlib
+import json
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
@@ -13,3 +15,10 @@ class Action:
     def __repr__(self):
         return f"Action(name={self.name}, params={self.params or {}})"
 
+    def cache_key(self) -> str:
+        """
+        Canonical hash of name + params (key order independent), usable as a cache key.
+        """
+        raw = json.dumps([self.name, self.params or {}], sort_keys=True, separators=(",", ":"), default=repr)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
@@ -0,0 +1,139 @@
+# =========================================================
+# ===== file: core/planner/budget.py
+# =========================================================
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PlanBudget:
+    """
+    Limits for one plan()/plan_anytime() call (None = unlimited).
+    - max_nodes: node expansions
+    - max_seconds: wall clock
+    - max_memory_bytes: retained search nodes (seen set + frontier) x node_bytes,
+      a cheap estimate like StateStore's approx_state_bytes (not exact)
+    """
+
+    def __init__(self, max_nodes: Optional[int] = None, max_seconds: Optional[float] = None,
+                 max_memory_bytes: Optional[int] = None, node_bytes: int = 512):
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.node_bytes = node_bytes
+
+    def exceeded(self, stats: "PlanStats", retained: int) -> Optional[str]:
+        """Name of the exhausted budget, or None."""
+        if self.max_nodes is not None and stats.nodes_expanded >= self.max_nodes:
+            return "node_budget"
+        if self.max_memory_bytes is not None and retained * self.node_bytes > self.max_memory_bytes:
+            return "memory_budget"
+        if self.max_seconds is not None and time.perf_counter() - stats.started >= self.max_seconds:
+            return "time_budget"
+        return None
+
+
+class PlanStats:
+    """
+    Search instrumentation for one planning call.
+    status: solved | exhausted | cache_hit | node_budget | time_budget | memory_budget
+    callbacks: per domain callback {"calls": n, "seconds": s}
+    """
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        self.status = "running"
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.duplicates_pruned = 0
+        self.cache_pruned = 0
+        self.peak_frontier = 0
+        self.peak_retained = 0
+        self.max_depth_reached = 0
+        self.iterations = 0
+        self.plan_length: Optional[int] = None
+        self.callbacks: Dict[str, Dict[str, Any]] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """
+        Wrap a domain callback so its calls and time land in self.callbacks.
+        A generator result (e.g. a lazy action_generator) is wrapped too, so
+        the time spent producing each item is counted as well.
+        """
+        slot = self.callbacks.setdefault(name, {"calls": 0, "seconds": 0.0})
+        clock = time.perf_counter
+
+        def drain(gen):
+            while True:
+                t0 = clock()
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+                finally:
+                    slot["seconds"] += clock() - t0
+                yield item
+
+        def call(*args):
+            t0 = clock()
+            try:
+                out = fn(*args)
+            finally:
+                slot["seconds"] += clock() - t0
+                slot["calls"] += 1
+            return drain(out) if inspect.isgenerator(out) else out
+        return call
+
+    def frontier(self, size: int, retained: int):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+        if retained > self.peak_retained:
+            self.peak_retained = retained
+
+    def finish(self, status: str, plan: Optional[List] = None) -> "PlanStats":
+        self.status = status
+        self.plan_length = None if plan is None else len(plan)
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "algorithm": self.algorithm,
+            "status": self.status,
+            "plan_length": self.plan_length,
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_generated": self.nodes_generated,
+            "duplicates_pruned": self.duplicates_pruned,
+            "cache_pruned": self.cache_pruned,
+            "peak_frontier": self.peak_frontier,
+            "peak_retained": self.peak_retained,
+            "max_depth_reached": self.max_depth_reached,
+            "iterations": self.iterations,
+            "elapsed_s": round(self.elapsed, 6),
+            "callbacks": {k: {"calls": v["calls"], "seconds": round(v["seconds"], 6)}
+                          for k, v in self.callbacks.items()},
+        }
+
+
+class PlanResult:
+    """
+    plan_anytime() outcome: the plan (complete, or the best partial prefix when a
+    budget ran out), whether it reaches the goal, and the search stats.
+    """
+
+    __slots__ = ("plan", "complete", "stats")
+
+    def __init__(self, plan: Optional[List], complete: bool, stats: PlanStats):
+        self.plan = plan
+        self.complete = complete
+        self.stats = stats
+
+    @property
+    def status(self) -> str:
+        return self.stats.status
+
+    def __repr__(self):
+        n = None if self.plan is None else len(self.plan)
+        return f"PlanResult(status={self.status}, complete={self.complete}, plan_len={n})"
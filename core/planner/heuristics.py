@@ -0,0 +1,36 @@
+# =========================================================
+# ===== file: core/planner/heuristics.py
+# =========================================================
+"""
+Cost / heuristic helpers for BestFirstPlanner.
+- cost_fn(state, action) -> float   (cost of applying action in state)
+- heuristic(state, goal) -> float   (estimated remaining cost; admissible = never overestimates)
+"""
+from typing import Callable, Dict
+
+
+def zero(state, goal) -> float:
+    # A* with h=0 is uniform-cost search
+    return 0.0
+
+
+def unit_cost(state, action) -> float:
+    return 1.0
+
+
+def cost_table(costs: Dict[str, float], default: float = 1.0) -> Callable:
+    """
+    cost_fn from a per-action-name table, e.g. cost_table({"login": 0.5, "refund": 5}).
+    """
+    def cost_fn(state, action) -> float:
+        return costs.get(action.name, default)
+    return cost_fn
+
+
+def max_of(*heuristics: Callable) -> Callable:
+    """
+    Pointwise max of heuristics (still admissible if each one is).
+    """
+    def h(state, goal) -> float:
+        return max(fn(state, goal) for fn in heuristics)
+    return h
@@ -0,0 +1,209 @@
+# =========================================================
+# ===== file: core/planner/parallel_planner.py
+# =========================================================
+import math
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from typing import Callable, List, Optional, Set
+
+from core.planner.budget import PlanBudget, PlanStats
+from core.planner.plan_cache import MISS, PlanCache
+from core.planner.search_planner import SearchPlanner, _Node
+from core.state.latent_state import LatentState
+from core.state.sim_state import SimState
+
+# per worker process: domain callbacks, plus the decoded base LatentState of the current plan() call
+_WORKER = {}
+
+
+def _init_worker(callbacks):
+    _WORKER["callbacks"] = callbacks
+    _WORKER["token"] = None
+
+
+def _expand(callbacks, states, goal, base=None):
+    """
+    Expand parent states in order -> per parent [(action, child, key, is_goal), ...].
+    With a base, states and children travel as SimState overlays (detach/attach).
+    """
+    state_key_fn, action_generator, transition_fn, goal_test = callbacks
+    out = []
+    for st in states:
+        if base is not None:
+            st = SimState.attach(base, st)
+        children = []
+        for act in action_generator(st, goal):
+            nxt = transition_fn(st, act)
+            k = state_key_fn(nxt)
+            is_goal = goal_test(nxt, goal)
+            if base is not None:
+                nxt = nxt.detach()
+            children.append((act, nxt, k, is_goal))
+        out.append(children)
+    return out
+
+
+def _expand_chunk(token, base_bytes, states, goal):
+    t0 = time.perf_counter()
+    base = None
+    if base_bytes is not None:
+        if _WORKER["token"] != token:
+            # encoded by the parent planner process, so trusted
+            _WORKER["base"] = LatentState.from_bytes(base_bytes, allow_pickle=True)
+            _WORKER["token"] = token
+        base = _WORKER["base"]
+    return _expand(_WORKER["callbacks"], states, goal, base), time.perf_counter() - t0
+
+
+class ParallelSearchPlanner(SearchPlanner):
+    """
+    Layer-synchronous BFS with frontier expansion on a process pool.
+    - each BFS layer is split into chunks; workers run action_generator /
+      transition_fn / state_key_fn / goal_test for their chunk
+    - duplicate detection (one shared seen set), cache probes and goal selection
+      stay in this process and walk the results in parent/action order, so the
+      plan is the same shortest plan sequential SearchPlanner returns
+    - SimState roots: the base LatentState is shipped once per worker per call
+      (codec bytes) and only overlays cross the process boundary
+    - layers smaller than min_parallel are expanded inline
+    Callbacks go to the workers once, at pool start: with the "spawn" start method
+    they must be picklable (module-level functions). Call close() when done.
+    """
+
+    algorithm = "parallel_bfs"
+
+    def __init__(
+        self,
+        state_key_fn: Optional[Callable],
+        action_generator: Callable,
+        transition_fn: Callable,
+        goal_test: Callable,
+        max_depth: int = 6,
+        workers: int = 4,
+        min_parallel: int = 64,
+        mp_context: Optional[str] = None,
+        simulate: Optional[bool] = None,
+        cache: Optional[PlanCache] = None,
+        use_cache: bool = True,
+        budget: Optional[PlanBudget] = None,
+        audit_logger=None,
+    ):
+        super().__init__(state_key_fn, action_generator, transition_fn, goal_test,
+                         max_depth=max_depth, simulate=simulate, cache=cache, use_cache=use_cache,
+                         budget=budget, audit_logger=audit_logger)
+        self.workers = workers
+        self.min_parallel = min_parallel
+        self.mp_context = mp_context
+        self._pool = None
+        self._tokens = count()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=((self.state_key_fn, self.action_generator, self.transition_fn, self.goal_test),),
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _expand_layer(self, layer: List[_Node], goal, cb, stats: PlanStats, ship):
+        if len(layer) < self.min_parallel or self.workers <= 1:
+            callbacks = (cb.state_key_fn, cb.action_generator, cb.transition_fn, cb.goal_test)
+            return _expand(callbacks, [n.state for n in layer], goal)
+
+        token, base, base_bytes = ship
+        if base is not None and base_bytes is None:
+            base_bytes = ship[2] = base.to_bytes()  # once per call, only if a layer goes to the pool
+        states = [n.state.detach() for n in layer] if base is not None else [n.state for n in layer]
+        size = max(1, math.ceil(len(states) / (self.workers * 4)))
+        pool = self._get_pool()
+        futs = [pool.submit(_expand_chunk, token, base_bytes, states[i:i + size], goal)
+                for i in range(0, len(states), size)]
+        slot = stats.callbacks.setdefault("worker_expand", {"calls": 0, "seconds": 0.0})
+        out = []
+        for f in futs:
+            children, seconds = f.result()
+            slot["calls"] += 1
+            slot["seconds"] += seconds
+            out.extend(children)
+        return out
+
+    def _run(self, init_state, goal, stats: PlanStats, budget: Optional[PlanBudget]):
+        cb = self._callbacks(stats)
+        root, gkey, hit = self._start(init_state, goal, cb)
+        if hit is not MISS:
+            return hit, "cache_hit"
+        cache = self.cache
+        base = root.state.base if isinstance(root.state, SimState) else None
+        ship = [next(self._tokens), base, None]
+
+        if cb.goal_test(root.state, goal):
+            return self._solved(root, gkey), "solved"
+        layer = [root]
+        seen: Set = {root.key}
+        best = None  # (plan length, node, cached suffix) via a cached subtree
+        depth = 0
+
+        while layer and depth < self.max_depth:
+            if budget is not None:
+                status = budget.exceeded(stats, len(seen) + len(layer))
+                if status is not None:
+                    return None, status
+            expanded = self._expand_layer(layer, goal, cb, stats, ship)
+            stats.nodes_expanded += len(layer)
+            depth += 1
+
+            nxt_layer = []
+            first_goal = None
+            for node, children in zip(layer, expanded):
+                for act, st, k, is_goal in children:
+                    stats.nodes_generated += 1
+                    if k in seen:
+                        stats.duplicates_pruned += 1
+                        continue
+                    seen.add(k)
+                    if base is not None and type(st) is tuple:
+                        st = SimState.attach(base, st)
+                    child = _Node(st, act, node, depth, key=k)
+                    if cache is not None:
+                        if cache.is_dead(k, gkey, self.max_depth - depth):
+                            stats.cache_pruned += 1
+                            continue
+                        suffix = cache.suffix(k, gkey)
+                        if suffix is not None:
+                            length = depth + len(suffix)
+                            if length <= self.max_depth and (best is None or length < best[0]):
+                                best = (length, child, suffix)
+                    if is_goal and first_goal is None:
+                        first_goal = child
+                    nxt_layer.append(child)
+            stats.frontier(len(nxt_layer), len(seen) + len(nxt_layer))
+            if nxt_layer:
+                stats.max_depth_reached = depth
+
+            # same order of checks as popping this layer in sequential BFS
+            if best is not None and best[0] <= depth:
+                return self._solved(best[1], gkey, best[2]), "solved"
+            if first_goal is not None:
+                return self._solved(first_goal, gkey), "solved"
+            layer = nxt_layer
+
+        if best is not None:
+            return self._solved(best[1], gkey, best[2]), "solved"
+        if cache is not None:
+            cache.store_dead(root.key, gkey, self.max_depth)
+        return None, "exhausted"
@@ -0,0 +1,136 @@
+# =========================================================
+# ===== file: core/planner/plan_cache.py
+# =========================================================
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MISS = object()
+
+_PLAN, _DEAD = 0, 1
+
+
+def goal_key(goal) -> Any:
+    """Hashable form of a goal (dict goals -> canonical JSON)."""
+    try:
+        hash(goal)
+        return goal
+    except TypeError:
+        return json.dumps(goal, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+def _within(length: int, max_depth: Optional[int]) -> bool:
+    return max_depth is None or length <= max_depth
+
+
+class PlanCache:
+    """
+    Bounded LRU keyed by (state key, goal key), shared across plan() calls.
+    - solved: the plan from that state (every state on a solved path stores its
+      suffix, so replans from intermediate states and searches that reach one
+      of them are transposition hits)
+    - dead end: no plan within `budget` actions (None = unbounded search failed)
+    invalidate() / invalidate_goal() are the hooks for when the action space
+    or domain callbacks change; entries are only valid for one domain.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, Any], Tuple[int, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.subtree_hits = 0
+        self.dead_prunes = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---- root lookup (counted in hit rate) ----
+    def lookup(self, state_key, gkey, max_depth: Optional[int]):
+        """List of actions, None (known dead end within max_depth), or MISS."""
+        entry = self._entries.get((state_key, gkey))
+        if entry is not None:
+            kind, val = entry
+            if kind == _PLAN and _within(len(val), max_depth):
+                self._entries.move_to_end((state_key, gkey))
+                self.hits += 1
+                return list(val)
+            if kind == _DEAD and (val is None or (max_depth is not None and val >= max_depth)):
+                self._entries.move_to_end((state_key, gkey))
+                self.hits += 1
+                return None
+        self.misses += 1
+        return MISS
+
+    # ---- probes during search ----
+    def suffix(self, state_key, gkey) -> Optional[Tuple]:
+        entry = self._entries.get((state_key, gkey))
+        if entry is not None and entry[0] == _PLAN:
+            self.subtree_hits += 1
+            return entry[1]
+        return None
+
+    def is_dead(self, state_key, gkey, remaining: Optional[int]) -> bool:
+        entry = self._entries.get((state_key, gkey))
+        if entry is None or entry[0] != _DEAD:
+            return False
+        budget = entry[1]
+        if budget is None or (remaining is not None and budget >= remaining):
+            self.dead_prunes += 1
+            return True
+        return False
+
+    def dead_budget(self, state_key, gkey) -> Optional[int]:
+        """Depth budget of a cached dead end (None = unbounded, or no dead entry)."""
+        entry = self._entries.get((state_key, gkey))
+        return entry[1] if entry is not None and entry[0] == _DEAD else None
+
+    # ---- stores ----
+    def store_path(self, keys: List, actions: List, gkey):
+        """keys[i] is the state before actions[i]; keys[-1] is the goal state."""
+        for i, k in enumerate(keys):
+            self._put((k, gkey), (_PLAN, tuple(actions[i:])))
+
+    def store_dead(self, state_key, gkey, budget: Optional[int]):
+        old = self._entries.get((state_key, gkey))
+        if old is not None and old[0] == _DEAD and old[1] is not None:
+            budget = None if budget is None else max(budget, old[1])
+        self._put((state_key, gkey), (_DEAD, budget))
+
+    def _put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ---- invalidation ----
+    def invalidate(self, predicate: Optional[Callable[[Any, Any], bool]] = None):
+        """Drop everything, or the (state_key, goal_key) pairs matching predicate."""
+        if predicate is None:
+            self._entries.clear()
+            return
+        for k in [k for k in self._entries if predicate(*k)]:
+            del self._entries[k]
+
+    def invalidate_goal(self, goal):
+        gkey = goal_key(goal)
+        self.invalidate(lambda _sk, gk: gk == gkey)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "subtree_hits": self.subtree_hits,
+            "dead_prunes": self.dead_prunes,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
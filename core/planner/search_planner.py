@@ -1,55 +1,385 @@
 # =========================================================
 # ===== file: core/planner/search_planner.py
 # =========================================================
+import heapq
 from collections import deque
-from typing import Callable, List, Optional, Set, Tuple
+from itertools import count
+from typing import Callable, Dict, List, Optional, Set
+
 from core.planner.action import Action
+from core.planner.budget import PlanBudget, PlanResult, PlanStats
+from core.planner.heuristics import unit_cost, zero
+from core.planner.plan_cache import MISS, PlanCache, goal_key
+from core.state.latent_state import LatentState
+from core.state.sim_state import SimState, planning_key
+
+
+class _Node:
+    """
+    Search node; the path is kept as a parent pointer instead of a copied list.
+    """
+    __slots__ = ("state", "action", "parent", "depth", "g", "key")
+
+    def __init__(self, state, action=None, parent=None, depth=0, g=0.0, key=None):
+        self.state = state
+        self.key = key
+        self.action = action
+        self.parent = parent
+        self.depth = depth
+        self.g = g
+
+    def path(self) -> List[Action]:
+        out: List[Action] = []
+        node = self
+        while node.parent is not None:
+            out.append(node.action)
+            node = node.parent
+        out.reverse()
+        return out
+
+    def keys(self) -> List:
+        out = []
+        node = self
+        while node is not None:
+            out.append(node.key)
+            node = node.parent
+        out.reverse()
+        return out
 
 
 class SearchPlanner:
     """
     Minimal BFS planner (agentless).
     - state is abstracted as a hashable key via state_key_fn
+      (None = core.state.sim_state.planning_key)
     - transitions are provided by action_generator (domain-specific)
     - goal_test checks whether the state satisfies the goal
+    - simulate=True: a LatentState init_state is wrapped in a SimState, so
+      transition_fn's snapshot()/update() only copy the simulated overlay.
+      None (default) wraps only with the default state_key_fn: custom callbacks
+      written against LatentState (short_history, compressed_core, ...) get the
+      LatentState itself
+    - cache: PlanCache shared across plan() calls (solved plans, dead ends,
+      path suffixes as a transposition table); use_cache=False disables it.
+      Call invalidate_cache() when the action space or callbacks change.
+    - budget: PlanBudget (nodes / seconds / memory); an exhausted plan() returns None,
+      plan_anytime() returns the best partial plan instead
+    - every call leaves a PlanStats in last_stats and emits "plan_search" to audit_logger
     """
 
+    algorithm = "bfs"
+
     def __init__(
         self,
-        state_key_fn: Callable,
+        state_key_fn: Optional[Callable],
         action_generator: Callable,
         transition_fn: Callable,
         goal_test: Callable,
         max_depth: int = 6,
+        simulate: Optional[bool] = None,
+        cache: Optional[PlanCache] = None,
+        use_cache: bool = True,
+        budget: Optional[PlanBudget] = None,
+        audit_logger=None,
     ):
-        self.state_key_fn = state_key_fn
+        self.state_key_fn = state_key_fn if state_key_fn is not None else planning_key
+        if simulate is None:
+            simulate = state_key_fn is None
         self.action_generator = action_generator
         self.transition_fn = transition_fn
         self.goal_test = goal_test
         self.max_depth = max_depth
+        self.simulate = simulate
+        self.cache = (cache if cache is not None else PlanCache()) if use_cache else None
+        self.budget = budget
+        self.audit_logger = audit_logger
+        self.last_stats: Optional[PlanStats] = None
+
+    def invalidate_cache(self, goal=None):
+        if self.cache is not None:
+            if goal is None:
+                self.cache.invalidate()
+            else:
+                self.cache.invalidate_goal(goal)
+
+    def plan(self, init_state, goal, budget: Optional[PlanBudget] = None) -> Optional[List[Action]]:
+        stats = PlanStats(self.algorithm)
+        plan, status = self._run(init_state, goal, stats, budget if budget is not None else self.budget)
+        self._report(stats.finish(status, plan), goal)
+        return plan
+
+    def plan_anytime(self, init_state, goal, budget: Optional[PlanBudget] = None,
+                     progress_fn: Optional[Callable] = None) -> PlanResult:
+        """
+        Iterative deepening (depth-first, memory O(depth x branching) per iteration)
+        up to max_depth; returns the same shortest plan as BFS when it finishes.
+        When a budget runs out, returns the best partial plan seen: lowest
+        progress_fn(state, goal) (default: the planner's heuristic, if any), deepest on ties.
+        """
+        stats = PlanStats("iddfs")
+        budget = budget if budget is not None else self.budget
+        cb = self._callbacks(stats)
+        if progress_fn is None:
+            progress_fn = getattr(self, "heuristic", None)
+        progress = stats.timed("progress_fn", progress_fn) if progress_fn is not None else None
+
+        root, gkey, hit = self._start(init_state, goal, cb)
+        if hit is not MISS:
+            stats.finish("cache_hit", hit)
+            self._report(stats, goal)
+            return PlanResult(hit, hit is not None, stats)
+
+        cache = self.cache
+        best_partial = (progress(root.state, goal) if progress else 0, 0, root)
+        limit = 0
+        while self.max_depth is None or limit <= self.max_depth:
+            stats.iterations += 1
+            visited = {root.key: 0}
+            stack = [[root, None]]
+            cutoff = False
+            while stack:
+                frame = stack[-1]
+                node, it = frame
+                if it is None:
+                    if cb.goal_test(node.state, goal):
+                        plan = self._solved(node, gkey)
+                        self._report(stats.finish("solved", plan), goal)
+                        return PlanResult(plan, True, stats)
+                    if node.depth >= limit:
+                        cutoff = True
+                        stack.pop()
+                        continue
+                    if budget is not None:
+                        status = budget.exceeded(stats, len(visited) + len(stack))
+                        if status is not None:
+                            plan = best_partial[2].path()
+                            self._report(stats.finish(status, plan), goal)
+                            return PlanResult(plan, False, stats)
+                    stats.nodes_expanded += 1
+                    it = frame[1] = iter(cb.action_generator(node.state, goal))
+                act = next(it, _DONE)
+                if act is _DONE:
+                    stack.pop()
+                    continue
+                nxt = cb.transition_fn(node.state, act)
+                k = cb.state_key_fn(nxt)
+                stats.nodes_generated += 1
+                depth = node.depth + 1
+                if visited.get(k, depth + 1) <= depth:
+                    stats.duplicates_pruned += 1
+                    continue
+                if cache is not None and cache.is_dead(k, gkey, limit - depth):
+                    stats.cache_pruned += 1
+                    if cache.dead_budget(k, gkey) is not None:
+                        cutoff = True  # only dead within a bound: deeper limits may still reach the goal
+                    continue
+                visited[k] = depth
+                child = _Node(nxt, act, node, depth, key=k)
+                if progress is not None or depth > best_partial[1]:
+                    score = progress(nxt, goal) if progress is not None else 0
+                    if (score, -depth) < (best_partial[0], -best_partial[1]):
+                        best_partial = (score, depth, child)
+                if depth > stats.max_depth_reached:
+                    stats.max_depth_reached = depth
+                stack.append([child, None])
+                stats.frontier(len(stack), len(visited) + len(stack))
+            if not cutoff:
+                break  # the whole reachable space fit under this limit
+            limit += 1
+
+        if cache is not None:
+            # no cutoff (depth limit or bounded dead-end prune) on the last
+            # iteration: unreachable at any depth
+            cache.store_dead(root.key, gkey, self.max_depth if cutoff else None)
+        self._report(stats.finish("exhausted"), goal)
+        return PlanResult(None, False, stats)
+
+    # ---- internals ----
+    def _callbacks(self, stats: PlanStats) -> "_Callbacks":
+        return _Callbacks(self, stats)
+
+    def _root(self, init_state):
+        if self.simulate and isinstance(init_state, LatentState):
+            return SimState(init_state)
+        return init_state
+
+    def _start(self, init_state, goal, cb):
+        init_state = self._root(init_state)
+        root = _Node(init_state, key=cb.state_key_fn(init_state))
+        gkey = goal_key(goal) if self.cache is not None else None
+        hit = MISS
+        if self.cache is not None:
+            hit = self.cache.lookup(root.key, gkey, self.max_depth)
+        return root, gkey, hit
+
+    def _solved(self, node: _Node, gkey, suffix=()) -> List[Action]:
+        path = node.path() + list(suffix)
+        if self.cache is not None:
+            self.cache.store_path(node.keys(), path, gkey)
+        return path
+
+    def _report(self, stats: PlanStats, goal):
+        self.last_stats = stats
+        if self.audit_logger:
+            self.audit_logger.emit("plan_search", lambda: {
+                "goal": goal,
+                "stats": stats.summary(),
+                "cache": self.cache.stats() if self.cache is not None else None,
+            })
 
-    def plan(self, init_state, goal) -> Optional[List[Action]]:
-        q = deque()
-        seen: Set[str] = set()
+    def _run(self, init_state, goal, stats: PlanStats, budget: Optional[PlanBudget]):
+        cb = self._callbacks(stats)
+        root, gkey, hit = self._start(init_state, goal, cb)
+        if hit is not MISS:
+            return hit, "cache_hit"
+        cache = self.cache
 
-        key0 = self.state_key_fn(init_state)
-        q.append((init_state, [], 0))
-        seen.add(key0)
+        q = deque([root])
+        seen: Set = {root.key}
+        best = None  # (plan length, node, cached suffix) via a cached subtree
 
         while q:
-            state, path, depth = q.popleft()
-            if self.goal_test(state, goal):
-                return path
-            if depth >= self.max_depth:
+            node = q.popleft()
+            if best is not None and best[0] <= node.depth:
+                break  # nothing left in the queue can beat the cached route
+            if cb.goal_test(node.state, goal):
+                return self._solved(node, gkey), "solved"
+            if node.depth >= self.max_depth:
                 continue
+            if budget is not None:
+                status = budget.exceeded(stats, len(seen) + len(q))
+                if status is not None:
+                    return None, status
+            stats.nodes_expanded += 1
 
-            for act in self.action_generator(state, goal):
-                nxt = self.transition_fn(state, act)
-                k = self.state_key_fn(nxt)
+            for act in cb.action_generator(node.state, goal):
+                nxt = cb.transition_fn(node.state, act)
+                k = cb.state_key_fn(nxt)
+                stats.nodes_generated += 1
                 if k in seen:
+                    stats.duplicates_pruned += 1
                     continue
                 seen.add(k)
-                q.append((nxt, path + [act], depth + 1))
+                child = _Node(nxt, act, node, node.depth + 1, key=k)
+                if cache is not None:
+                    if cache.is_dead(k, gkey, self.max_depth - child.depth):
+                        stats.cache_pruned += 1
+                        continue
+                    suffix = cache.suffix(k, gkey)
+                    if suffix is not None:
+                        length = child.depth + len(suffix)
+                        if length <= self.max_depth and (best is None or length < best[0]):
+                            best = (length, child, suffix)
+                q.append(child)
+                if child.depth > stats.max_depth_reached:
+                    stats.max_depth_reached = child.depth
+            stats.frontier(len(q), len(seen) + len(q))
 
-        return None
+        if best is not None:
+            return self._solved(best[1], gkey, best[2]), "solved"
+        if cache is not None:
+            cache.store_dead(root.key, gkey, self.max_depth)
+        return None, "exhausted"
+
+
+_DONE = object()
+
+
+class _Callbacks:
+    """Domain callbacks of one planning call, wrapped for PlanStats timing."""
+
+    def __init__(self, planner: SearchPlanner, stats: PlanStats):
+        self.state_key_fn = stats.timed("state_key_fn", planner.state_key_fn)
+        self.action_generator = stats.timed("action_generator", planner.action_generator)
+        self.transition_fn = stats.timed("transition_fn", planner.transition_fn)
+        self.goal_test = stats.timed("goal_test", planner.goal_test)
+        if hasattr(planner, "heuristic"):
+            self.heuristic = stats.timed("heuristic", planner.heuristic)
+            self.cost_fn = stats.timed("cost_fn", planner.cost_fn)
+
+
+class BestFirstPlanner(SearchPlanner):
+    """
+    A* / weighted-A* planner over the same domain callbacks as SearchPlanner.
+    - cost_fn(state, action): action cost (default: 1 per action)
+    - heuristic(state, goal): remaining-cost estimate (default: 0 -> uniform-cost search)
+    - weight: f = g + weight * h; with an admissible heuristic the plan cost is
+      at most weight x optimal (weight=1 is plain A*, optimal)
+    - max_depth: action-count limit (None = unbounded)
+    Returns the cheapest plan found, or None. Dead ends are only cached for
+    unbounded searches (a depth-limited A* with non-unit costs is not complete).
+    """
+
+    algorithm = "astar"
+
+    def __init__(
+        self,
+        state_key_fn: Callable,
+        action_generator: Callable,
+        transition_fn: Callable,
+        goal_test: Callable,
+        heuristic: Callable = zero,
+        cost_fn: Callable = unit_cost,
+        weight: float = 1.0,
+        max_depth: Optional[int] = 6,
+        simulate: Optional[bool] = None,
+        cache: Optional[PlanCache] = None,
+        use_cache: bool = True,
+        budget: Optional[PlanBudget] = None,
+        audit_logger=None,
+    ):
+        super().__init__(state_key_fn, action_generator, transition_fn, goal_test,
+                         max_depth=max_depth, simulate=simulate, cache=cache, use_cache=use_cache,
+                         budget=budget, audit_logger=audit_logger)
+        if weight < 1.0:
+            raise ValueError("weight must be >= 1")
+        self.heuristic = heuristic
+        self.cost_fn = cost_fn
+        self.weight = weight
+
+    def _run(self, init_state, goal, stats: PlanStats, budget: Optional[PlanBudget]):
+        cb = self._callbacks(stats)
+        root, gkey, hit = self._start(init_state, goal, cb)
+        if hit is not MISS:
+            return hit, "cache_hit"
+        cache = self.cache
+        tie = count()  # FIFO among equal f, and nodes never get compared
+        best_g: Dict = {root.key: 0.0}
+        frontier = [(self.weight * cb.heuristic(root.state, goal), next(tie), root)]
+
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node.g > best_g[node.key]:
+                continue  # stale entry: a cheaper path to this state was queued later
+            if cb.goal_test(node.state, goal):
+                return self._solved(node, gkey), "solved"
+            if self.max_depth is not None and node.depth >= self.max_depth:
+                continue
+            if budget is not None:
+                status = budget.exceeded(stats, len(best_g) + len(frontier))
+                if status is not None:
+                    return None, status
+            stats.nodes_expanded += 1
+
+            for act in cb.action_generator(node.state, goal):
+                g = node.g + cb.cost_fn(node.state, act)
+                nxt = cb.transition_fn(node.state, act)
+                k = cb.state_key_fn(nxt)
+                stats.nodes_generated += 1
+                if g >= best_g.get(k, float("inf")):
+                    stats.duplicates_pruned += 1
+                    continue
+                if cache is not None and cache.is_dead(
+                        k, gkey, None if self.max_depth is None else self.max_depth - node.depth - 1):
+                    stats.cache_pruned += 1
+                    continue
+                best_g[k] = g
+                f = g + self.weight * cb.heuristic(nxt, goal)
+                heapq.heappush(frontier, (f, next(tie), _Node(nxt, act, node, node.depth + 1, g, k)))
+                if node.depth + 1 > stats.max_depth_reached:
+                    stats.max_depth_reached = node.depth + 1
+            stats.frontier(len(frontier), len(best_g) + len(frontier))
 
+        if cache is not None and self.max_depth is None:
+            cache.store_dead(root.key, gkey, None)
+        return None, "exhausted"
@@ -0,0 +1,223 @@
+# =========================================================
+# ===== file: core/session/sharded.py
+# =========================================================
+import multiprocessing as mp
+import pickle
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.infer.cost import CostCounter
+from core.session.state_store import StateStore
+
+
+# how often the result collector checks that every worker process is alive
+_LIVENESS_POLL = 0.5
+_IDLE = object()
+
+
+def _portable_error(e: BaseException) -> BaseException:
+    # exceptions travel back through a Queue; unpicklable ones would hang the future
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return RuntimeError(f"{e.__class__.__name__}: {e}")
+
+
+def _worker_main(engine_factory, store_factory, inbox, outbox):
+    engine = engine_factory()
+    store = store_factory() if store_factory else StateStore()
+    cost = CostCounter()
+    try:
+        while True:
+            msg = inbox.get()
+            if msg is None:
+                break
+            req_id, op, session_id, arg = msg
+            try:
+                if op == "consume":
+                    state, delta, guard_trace = engine.consume(store.get(session_id), arg, cost)
+                    store.commit(session_id, state)
+                    result = {"delta": delta.summary(), "guard_trace": guard_trace}
+                elif op == "consume_many":
+                    blocks, partial = arg
+                    state, delta, trace = engine.consume_many(store.get(session_id), blocks, cost, partial=partial)
+                    store.commit(session_id, state)
+                    result = {"delta": delta.summary(), "trace": trace}
+                elif op == "reason":
+                    result = engine.reason(store.get(session_id))
+                elif op == "summary":
+                    result = store.get(session_id).summary()
+                elif op == "stats":
+                    result = {"cost": cost.summary(), "store": store.stats()}
+                else:
+                    raise ValueError(f"unknown op: {op}")
+                outbox.put((req_id, True, result))
+            except Exception as e:
+                outbox.put((req_id, False, _portable_error(e)))
+    finally:
+        if getattr(engine, "audit_logger", None) is not None:
+            engine.audit_logger.close()
+        if hasattr(store, "close"):
+            store.close()
+
+
+class ShardedEngine:
+    """
+    Multi-process session runtime.
+    - session_id is hashed (crc32) to one of `workers` processes; each worker owns
+      its own LatentFlowEngine (engine_factory) and its slice of StateStore (store_factory)
+    - one FIFO inbox per worker keeps per-session block order; different sessions
+      run in parallel on different workers
+    - submit/submit_many/submit_reason return concurrent.futures.Future;
+      consume/consume_many/reason block on the result
+    - if a worker process dies, its pending futures fail with RuntimeError and
+      later requests for its sessions fail immediately
+    Factories must be picklable (module-level functions) under the "spawn" start method.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], Any],
+        workers: int = 4,
+        store_factory: Optional[Callable[[], StateStore]] = None,
+        mp_context: Optional[str] = None,
+    ):
+        ctx = mp.get_context(mp_context)
+        self.workers = workers
+        self._outbox = ctx.Queue()
+        self._inboxes = [ctx.Queue() for _ in range(workers)]
+        self._procs = [
+            ctx.Process(target=_worker_main, args=(engine_factory, store_factory, q, self._outbox), daemon=True)
+            for q in self._inboxes
+        ]
+        for p in self._procs:
+            p.start()
+
+        self._futures: Dict[int, Tuple[int, Future]] = {}  # req_id -> (shard, future)
+        self._dead: Dict[int, Optional[int]] = {}  # shard -> worker exit code
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect, name="sharded-results", daemon=True)
+        self._collector.start()
+
+    def shard_of(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % self.workers
+
+    # ---- futures API ----
+    def submit(self, session_id: str, block) -> Future:
+        return self._send(self.shard_of(session_id), "consume", session_id, block)
+
+    def submit_many(self, session_id: str, blocks: Iterable, partial: bool = False) -> Future:
+        return self._send(self.shard_of(session_id), "consume_many", session_id, (list(blocks), partial))
+
+    def submit_reason(self, session_id: str) -> Future:
+        return self._send(self.shard_of(session_id), "reason", session_id, None)
+
+    # ---- blocking API ----
+    def consume(self, session_id: str, block):
+        return self.submit(session_id, block).result()
+
+    def consume_many(self, session_id: str, blocks: Iterable, partial: bool = False):
+        return self.submit_many(session_id, blocks, partial).result()
+
+    def reason(self, session_id: str):
+        return self.submit_reason(session_id).result()
+
+    def summary(self, session_id: str) -> Dict[str, Any]:
+        return self._send(self.shard_of(session_id), "summary", session_id, None).result()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        futs = [self._send(i, "stats", None, None) for i in range(self.workers)]
+        return [f.result() for f in futs]
+
+    # ---- lifecycle ----
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for q in self._inboxes:
+            q.put(None)
+        for p in self._procs:
+            p.join()
+        self._outbox.put(None)
+        self._collector.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- internals ----
+    def _send(self, shard: int, op: str, session_id, arg) -> Future:
+        if self._closed:
+            raise RuntimeError("ShardedEngine is closed")
+        fut: Future = Future()
+        with self._lock:
+            if shard in self._dead:
+                fut.set_exception(self._dead_error(shard))
+                return fut
+            req_id = self._next_id
+            self._next_id += 1
+            self._futures[req_id] = (shard, fut)
+        self._inboxes[shard].put((req_id, op, session_id, arg))
+        return fut
+
+    def _dead_error(self, shard: int) -> RuntimeError:
+        return RuntimeError(f"shard {shard} worker died (exit code {self._dead[shard]})")
+
+    def _resolve(self, msg):
+        req_id, ok, result = msg
+        with self._lock:
+            entry = self._futures.pop(req_id, None)
+        if entry is None:
+            return
+        if ok:
+            entry[1].set_result(result)
+        else:
+            entry[1].set_exception(result)
+
+    def _check_workers(self):
+        died = [i for i, p in enumerate(self._procs) if i not in self._dead and not p.is_alive()]
+        if not died:
+            return
+        # results the workers sent before dying are still in the outbox
+        while True:
+            try:
+                msg = self._outbox.get_nowait()
+            except queue.Empty:
+                break
+            if msg is None:
+                self._outbox.put(None)  # close() sentinel: keep it for the main loop
+                break
+            self._resolve(msg)
+        with self._lock:
+            for i in died:
+                self._dead[i] = self._procs[i].exitcode
+            lost = [(rid, e) for rid, e in self._futures.items() if e[0] in self._dead]
+            for rid, _ in lost:
+                del self._futures[rid]
+        for _, (shard, fut) in lost:
+            fut.set_exception(self._dead_error(shard))
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                msg = self._outbox.get(timeout=_LIVENESS_POLL)
+            except queue.Empty:
+                msg = _IDLE
+            if msg is None:
+                break
+            if msg is not _IDLE:
+                self._resolve(msg)
+            # also checked under steady traffic from the other shards
+            if not self._closed and time.monotonic() - last_check >= _LIVENESS_POLL:
+                self._check_workers()
+                last_check = time.monotonic()
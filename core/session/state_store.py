@@ -1,22 +1,195 @@
 # =========================================================
 # ===== file: core/session/state_store.py
 # =========================================================
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
 from core.state.latent_state import LatentState
 
 
+def _dumps(state: LatentState) -> bytes:
+    return state.to_bytes()
+
+
+def _loads(data: bytes, allow_pickle: bool = False) -> LatentState:
+    return LatentState.from_bytes(data, allow_pickle=allow_pickle)
+
+
+def approx_state_bytes(state: LatentState) -> int:
+    """
+    Cheap O(1) memory estimate used for the max_bytes budget (not exact).
+    """
+    n = 512
+    n += state.dedup.memory_bytes()
+    n += 256 * len(state.short_history)
+    n += 512 * len(state.compressed_core)
+    return n
+
+
+class SQLiteSpill:
+    """
+    On-disk tier for evicted sessions: one SQLite file in WAL mode.
+    An existing file is reused, but its rows are not trusted: `written` holds
+    the ids this instance stored, the only rows decoded with allow_pickle.
+    """
+
+    def __init__(self, path: str):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._db.commit()
+        self.written: Set[str] = set()
+
+    def put(self, session_id: str, data: bytes):
+        self._db.execute("INSERT OR REPLACE INTO sessions (id, data) VALUES (?, ?)", (session_id, data))
+        self._db.commit()
+        self.written.add(session_id)
+
+    def put_many(self, items):
+        items = list(items)
+        self._db.executemany("INSERT OR REPLACE INTO sessions (id, data) VALUES (?, ?)", items)
+        self._db.commit()
+        self.written.update(sid for sid, _ in items)
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        row = self._db.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, session_id: str):
+        self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self._db.commit()
+        self.written.discard(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
 class StateStore:
     """
     In-memory session state store (v0.2).
     Swap with Redis later.
+
+    Optional memory budget (max_sessions and/or approximate max_bytes): the
+    least recently used idle sessions are evicted to `spill_path` (SQLite, WAL)
+    and loaded back transparently on get(). Without a spill_path evicted
+    sessions are dropped. Rows already in an existing spill file still load,
+    but only if they hold no pickled values (CodecError otherwise).
     """
 
-    def __init__(self):
-        self._store = {}
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        spill_path: Optional[str] = None,
+        state_factory: Callable[[], LatentState] = LatentState,
+        sizeof: Callable[[LatentState], int] = approx_state_bytes,
+    ):
+        self._store: "OrderedDict[str, LatentState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.state_factory = state_factory
+        self.sizeof = sizeof
+        self.spill = SQLiteSpill(spill_path) if spill_path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.spill_loads = 0
+        self.evictions = 0
 
     def get(self, session_id: str) -> LatentState:
-        if session_id not in self._store:
-            self._store[session_id] = LatentState()
-        return self._store[session_id]
+        state = self._store.get(session_id)
+        if state is not None:
+            self.hits += 1
+            self._store.move_to_end(session_id)
+            return state
+
+        data = self.spill.get(session_id) if self.spill is not None else None
+        if data is not None:
+            self.spill_loads += 1
+            # pickled values only from rows this process wrote, never from a file found on disk
+            state = _loads(data, allow_pickle=session_id in self.spill.written)
+        else:
+            self.misses += 1
+            state = self.state_factory()
+        self._put(session_id, state)
+        return state
 
     def commit(self, session_id: str, state: LatentState):
-        self._store[session_id] = state
\ No newline at end of file
+        self._put(session_id, state)
+
+    def _put(self, session_id: str, state: LatentState):
+        self._bytes -= self._sizes.get(session_id, 0)
+        self._store[session_id] = state
+        self._store.move_to_end(session_id)
+        if self.max_bytes is not None:
+            size = self.sizeof(state)
+            self._sizes[session_id] = size
+            self._bytes += size
+        self._enforce_budget(keep=session_id)
+
+    def _over_budget(self) -> bool:
+        if self.max_sessions is not None and len(self._store) > self.max_sessions:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def _enforce_budget(self, keep: str):
+        if not self._over_budget():
+            return
+        # evict from the LRU head; skipped sessions rotate to the tail, so the
+        # loop stops once every remaining session has been skipped
+        skipped = 0
+        while self._over_budget() and skipped < len(self._store):
+            sid = next(iter(self._store))
+            # never evict the session just touched or one mid-transaction
+            if sid == keep or self._store[sid].in_transaction:
+                self._store.move_to_end(sid)
+                skipped += 1
+                continue
+            self._evict(sid)
+
+    def _evict(self, session_id: str):
+        state = self._store.pop(session_id)
+        self._bytes -= self._sizes.pop(session_id, 0)
+        if self.spill is not None:
+            self.spill.put(session_id, _dumps(state))
+        self.evictions += 1
+
+    def flush(self):
+        """Write every in-memory session to the spill tier (keeps them in memory)."""
+        if self.spill is not None:
+            self.spill.put_many((sid, _dumps(state)) for sid, state in self._store.items())
+
+    def close(self):
+        self.flush()
+        if self.spill is not None:
+            self.spill.close()
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._store or (self.spill is not None and session_id in self.spill)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_memory": len(self._store),
+            "approx_bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spill_loads": self.spill_loads,
+            "evictions": self.evictions,
+        }
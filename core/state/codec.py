@@ -0,0 +1,422 @@
+# core/state/codec.py
+"""
+Compact, versioned binary codec for LatentState (to_bytes / from_bytes).
+
+Layout (v1): MAGIC | version | header varints | string table | short_history
+| compressed_core | dedup window. Integers are LEB128 varints (zigzag for signed
+values), block_type names are stored once in a string table and referenced by
+index, hex block ids are packed into raw bytes. The per-type index is not stored;
+it is rebuilt from compressed_core + short_history on decode. A TTLDedup
+comes back with the default clock, so persisted TTL windows should use a
+wall clock (time.time) rather than time.monotonic.
+
+Values the codec has no tag for (and custom dedup backends) are pickled.
+Unpickling can run arbitrary code, so decode_state refuses them with
+CodecError unless allow_pickle=True; only pass that for trusted payloads.
+"""
+import pickle
+import struct
+from typing import Any, Dict, List, Optional
+
+from core.infer.block import Block
+from core.state.dedup import BloomDedup, LRUDedup, TTLDedup
+from core.state.latent_state import LatentState
+
+MAGIC = b"LFS"
+VERSION = 1
+
+_F64 = struct.Struct("<d")
+
+# value tags
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _DICT, _PICKLE = range(11)
+
+# block id tags
+_ID_LAZY, _ID_HEX, _ID_STR = range(3)
+
+# dedup backend tags
+_DEDUP_PICKLE, _DEDUP_LRU, _DEDUP_TTL, _DEDUP_BLOOM = range(4)
+
+_CORE_KEYS = ("count", "first_seen", "last", "recent")
+
+
+class CodecError(ValueError):
+    pass
+
+
+# ---------------- encoder ----------------
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def uint(self, n: int):
+        buf = self.buf
+        while n > 0x7F:
+            buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+        buf.append(n)
+
+    def sint(self, n: int):
+        self.uint(n << 1 if n >= 0 else ((-n) << 1) - 1)
+
+    def f64(self, x: float):
+        self.buf += _F64.pack(x)
+
+    def raw(self, b: bytes):
+        self.uint(len(b))
+        self.buf += b
+
+    def text(self, s: str):
+        self.raw(s.encode("utf-8"))
+
+    def ref(self, s: str):
+        self.uint(self.strings[s])
+
+    def opt_uint(self, n: Optional[int]):
+        # 0 = None, else n + 1
+        self.uint(0 if n is None else n + 1)
+
+    def block_id(self, bid: Optional[str]):
+        if bid is None:
+            self.buf.append(_ID_LAZY)
+            return
+        if len(bid) == 16:
+            try:
+                packed = bytes.fromhex(bid)
+            except ValueError:
+                packed = None
+            if packed is not None and packed.hex() == bid:
+                self.buf.append(_ID_HEX)
+                self.buf += packed
+                return
+        self.buf.append(_ID_STR)
+        self.text(bid)
+
+    def block_ids(self, ids: List[str]):
+        # bulk path: all ids are 16-char lowercase hex -> one packed blob
+        self.uint(len(ids))
+        joined = "".join(ids)
+        if len(joined) == 16 * len(ids):
+            try:
+                packed = bytes.fromhex(joined)
+            except ValueError:
+                packed = None
+            if packed is not None and packed.hex() == joined:
+                self.buf.append(1)
+                self.buf += packed
+                return
+        self.buf.append(0)
+        for bid in ids:
+            self.block_id(bid)
+
+    def value(self, x: Any):
+        buf = self.buf
+        t = type(x)
+        if x is None:
+            buf.append(_NONE)
+        elif t is bool:
+            buf.append(_TRUE if x else _FALSE)
+        elif t is int:
+            buf.append(_INT)
+            self.sint(x)
+        elif t is float:
+            buf.append(_FLOAT)
+            self.f64(x)
+        elif t is str:
+            buf.append(_STR)
+            self.text(x)
+        elif t is bytes:
+            buf.append(_BYTES)
+            self.raw(x)
+        elif t is list or t is tuple:
+            buf.append(_LIST if t is list else _TUPLE)
+            self.uint(len(x))
+            for v in x:
+                self.value(v)
+        elif t is dict:
+            buf.append(_DICT)
+            self.uint(len(x))
+            for k, v in x.items():
+                self.value(k)
+                self.value(v)
+        else:
+            buf.append(_PICKLE)
+            self.raw(pickle.dumps(x, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def encode_state(state: LatentState) -> bytes:
+    if state.in_transaction:
+        raise CodecError("cannot encode a LatentState with an active transaction")
+    w = _Writer()
+    w.buf += MAGIC
+    w.buf.append(VERSION)
+
+    for n in (state.max_history, state.counter, state.seen_events, state.dedup_hits,
+              state.core_total, state.compress_count):
+        w.uint(n)
+    w.opt_uint(state.dedup_capacity)
+
+    # string table: block_type names
+    names: List[str] = []
+    for t in list(state.compressed_core.keys()) + [b.block_type for b in state.short_history]:
+        if t not in w.strings:
+            w.strings[t] = len(names)
+            names.append(t)
+    w.uint(len(names))
+    for t in names:
+        w.text(t)
+
+    # short_history
+    w.uint(len(state.short_history))
+    for b in state.short_history:
+        w.ref(b.block_type)
+        w.f64(b.ts)
+        # resolved here, so the decoding process never re-hashes with its own set_id_hash
+        w.block_id(b.block_id)
+        w.value(b.content)
+
+    # compressed_core
+    w.uint(len(state.compressed_core))
+    for t, entry in state.compressed_core.items():
+        w.ref(t)
+        if (type(entry) is dict and tuple(entry.keys()) == _CORE_KEYS
+                and type(entry["count"]) is int and type(entry["recent"]) is list):
+            w.buf.append(1)
+            w.uint(entry["count"])
+            w.value(entry["first_seen"])
+            w.value(entry["last"])
+            w.uint(len(entry["recent"]))
+            for v in entry["recent"]:
+                w.value(v)
+        else:
+            w.buf.append(0)
+            w.value(entry)
+
+    _encode_dedup(w, state.dedup)
+    return bytes(w.buf)
+
+
+def _encode_dedup(w: _Writer, d):
+    t = type(d)
+    if t is LRUDedup:
+        w.buf.append(_DEDUP_LRU)
+        w.uint(d.capacity)
+        w.block_ids(list(d._lru))
+    elif t is TTLDedup:
+        w.buf.append(_DEDUP_TTL)
+        w.f64(d.ttl)
+        w.opt_uint(d.capacity)
+        w.block_ids(list(d._entries.keys()))
+        w.buf += struct.pack(f"<{len(d._entries)}d", *d._entries.values())
+    elif t is BloomDedup:
+        w.buf.append(_DEDUP_BLOOM)
+        w.uint(d.capacity)
+        w.f64(d.fp_rate)
+        w.uint(d._cur_count)
+        w.uint(d._prev_count)
+        w.raw(bytes(d._cur))
+        w.raw(bytes(d._prev))
+    else:
+        w.buf.append(_DEDUP_PICKLE)
+        w.raw(pickle.dumps(d, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# ---------------- decoder ----------------
+class _Reader:
+    def __init__(self, data: bytes, allow_pickle: bool = False):
+        self.mv = memoryview(data)
+        self.pos = 0
+        self.strings: List[str] = []
+        self.allow_pickle = allow_pickle
+
+    def unpickle(self) -> Any:
+        if not self.allow_pickle:
+            raise CodecError("payload contains pickled data; decode with allow_pickle=True only if it is trusted")
+        return pickle.loads(self.raw())
+
+    def byte(self) -> int:
+        b = self.mv[self.pos]
+        self.pos += 1
+        return b
+
+    def uint(self) -> int:
+        mv = self.mv
+        shift = n = 0
+        while True:
+            b = mv[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def sint(self) -> int:
+        n = self.uint()
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+    def f64(self) -> float:
+        x = _F64.unpack_from(self.mv, self.pos)[0]
+        self.pos += 8
+        return x
+
+    def raw(self) -> bytes:
+        n = self.uint()
+        b = self.mv[self.pos:self.pos + n].tobytes()
+        self.pos += n
+        return b
+
+    def text(self) -> str:
+        n = self.uint()
+        s = str(self.mv[self.pos:self.pos + n], "utf-8")
+        self.pos += n
+        return s
+
+    def ref(self) -> str:
+        return self.strings[self.uint()]
+
+    def opt_uint(self) -> Optional[int]:
+        n = self.uint()
+        return None if n == 0 else n - 1
+
+    def block_id(self) -> Optional[str]:
+        tag = self.byte()
+        if tag == _ID_LAZY:
+            return None
+        if tag == _ID_HEX:
+            s = self.mv[self.pos:self.pos + 8].hex()
+            self.pos += 8
+            return s
+        return self.text()
+
+    def block_ids(self) -> List[str]:
+        n = self.uint()
+        if self.byte() == 1:
+            h = self.mv[self.pos:self.pos + 8 * n].hex()
+            self.pos += 8 * n
+            return [h[i:i + 16] for i in range(0, 16 * n, 16)]
+        return [self.block_id() for _ in range(n)]
+
+    def value(self) -> Any:
+        tag = self.byte()
+        if tag == _NONE:
+            return None
+        if tag == _FALSE:
+            return False
+        if tag == _TRUE:
+            return True
+        if tag == _INT:
+            return self.sint()
+        if tag == _FLOAT:
+            return self.f64()
+        if tag == _STR:
+            return self.text()
+        if tag == _BYTES:
+            return self.raw()
+        if tag == _LIST:
+            return [self.value() for _ in range(self.uint())]
+        if tag == _TUPLE:
+            return tuple(self.value() for _ in range(self.uint()))
+        if tag == _DICT:
+            n = self.uint()
+            out = {}
+            for _ in range(n):
+                k = self.value()
+                out[k] = self.value()
+            return out
+        if tag == _PICKLE:
+            return self.unpickle()
+        raise CodecError(f"unknown value tag {tag}")
+
+
+def decode_state(data: bytes, allow_pickle: bool = False) -> LatentState:
+    if bytes(data[:3]) != MAGIC:
+        raise CodecError("not a LatentState payload")
+    version = data[3]
+    if version != VERSION:
+        raise CodecError(f"unsupported LatentState codec version {version}")
+    r = _Reader(data, allow_pickle=allow_pickle)
+    r.pos = 4
+
+    max_history, counter, seen_events, dedup_hits, core_total, compress_count = (r.uint() for _ in range(6))
+    dedup_capacity = r.opt_uint()
+    r.strings = [r.text() for _ in range(r.uint())]
+
+    short: List[Block] = []
+    for _ in range(r.uint()):
+        t = r.ref()
+        ts = r.f64()
+        bid = r.block_id()
+        short.append(Block(r.value(), block_type=t, ts=ts, block_id=bid))
+
+    core: Dict[str, Any] = {}
+    for _ in range(r.uint()):
+        t = r.ref()
+        if r.byte() == 1:
+            count = r.uint()
+            first_seen = r.value()
+            last = r.value()
+            recent = [r.value() for _ in range(r.uint())]
+            core[t] = {"count": count, "first_seen": first_seen, "last": last, "recent": recent}
+        else:
+            core[t] = r.value()
+
+    dedup = _decode_dedup(r)
+
+    state = LatentState(max_history=max_history, dedup=dedup)
+    state.dedup_capacity = dedup_capacity
+    state.counter = counter
+    state.seen_events = seen_events
+    state.dedup_hits = dedup_hits
+    state.core_total = core_total
+    state.compress_count = compress_count
+    state.short_history = short
+    state.compressed_core = core
+    _rebuild_type_index(state)
+    return state
+
+
+def _decode_dedup(r: _Reader):
+    tag = r.byte()
+    if tag == _DEDUP_LRU:
+        d = LRUDedup(r.uint())
+        ids = r.block_ids()
+        d._lru.extend(ids)
+        d._set.update(ids)
+        return d
+    if tag == _DEDUP_TTL:
+        ttl = r.f64()
+        d = TTLDedup(ttl, capacity=r.opt_uint())
+        ids = r.block_ids()
+        times = struct.unpack_from(f"<{len(ids)}d", r.mv, r.pos)
+        r.pos += 8 * len(ids)
+        d._entries.update(zip(ids, times))
+        return d
+    if tag == _DEDUP_BLOOM:
+        capacity = r.uint()
+        d = BloomDedup(capacity=capacity, fp_rate=r.f64())
+        d._cur_count = r.uint()
+        d._prev_count = r.uint()
+        d._cur = bytearray(r.raw())
+        d._prev = bytearray(r.raw())
+        return d
+    if tag == _DEDUP_PICKLE:
+        return r.unpickle()
+    raise CodecError(f"unknown dedup tag {tag}")
+
+
+def _rebuild_type_index(state: LatentState):
+    counts: Dict[str, int] = {}
+    last: Dict[str, Any] = {}
+    for t, entry in state.compressed_core.items():
+        if isinstance(entry, dict) and entry.get("count", 0):
+            counts[t] = int(entry["count"])
+            last[t] = entry.get("last")
+    short: Dict[str, int] = {}
+    for b in state.short_history:
+        t = b.block_type
+        counts[t] = counts.get(t, 0) + 1
+        short[t] = short.get(t, 0) + 1
+        last[t] = b.content
+    state.type_counts = counts
+    state.short_type_counts = short
+    state.type_last = last
@@ -0,0 +1,239 @@
+# core/state/dedup.py
+import hashlib
+import math
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+# rough per-id cost for a 16-char hex block_id str object
+_ID_BYTES = sys.getsizeof("0" * 16)
+
+
+class DedupWindow:
+    """
+    Idempotency window used by LatentState.
+    remember() returns an undo token (None if nothing changed) that undo() reverts,
+    so LatentState transactions can roll back dedup changes in O(delta).
+    """
+
+    name = "base"
+
+    def seen(self, block_id: str) -> bool:
+        raise NotImplementedError
+
+    def remember(self, block_id: str):
+        raise NotImplementedError
+
+    def undo(self, token) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        raise NotImplementedError
+
+    def bounded(self) -> bool:
+        """Backend-specific capacity invariant (checked by INV-3)."""
+        raise NotImplementedError
+
+    def summary(self) -> Dict[str, Any]:
+        return {"backend": self.name, "size": len(self), "memory_bytes": self.memory_bytes()}
+
+
+class LRUDedup(DedupWindow):
+    """
+    Exact window of the last `capacity` distinct ids (deque + set).
+    """
+
+    name = "lru"
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._lru = deque()
+        self._set = set()
+
+    def seen(self, block_id: str) -> bool:
+        return block_id in self._set
+
+    def remember(self, block_id: str):
+        if block_id in self._set:
+            return None
+        old = None
+        if len(self._lru) >= self.capacity:
+            # evict oldest
+            old = self._lru.popleft()
+            self._set.discard(old)
+        self._lru.append(block_id)
+        self._set.add(block_id)
+        return (block_id, old)
+
+    def undo(self, token) -> None:
+        block_id, old = token
+        self._lru.pop()
+        self._set.discard(block_id)
+        if old is not None:
+            self._lru.appendleft(old)
+            self._set.add(old)
+
+    def __iter__(self):
+        return iter(self._lru)
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._lru) + sys.getsizeof(self._set) + len(self._lru) * _ID_BYTES
+
+    def bounded(self) -> bool:
+        return len(self._lru) <= self.capacity
+
+    def summary(self) -> Dict[str, Any]:
+        out = super().summary()
+        out["capacity"] = self.capacity
+        return out
+
+
+class TTLDedup(DedupWindow):
+    """
+    Exact window of ids remembered in the last `ttl` seconds,
+    optionally also capped at `capacity` ids (oldest evicted first).
+    Expired ids are purged lazily on remember().
+    """
+
+    name = "ttl"
+
+    def __init__(self, ttl: float, capacity: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self._entries: "OrderedDict[str, float]" = OrderedDict()  # id -> remembered at
+
+    def seen(self, block_id: str) -> bool:
+        t = self._entries.get(block_id)
+        return t is not None and self.clock() - t < self.ttl
+
+    def remember(self, block_id: str):
+        if self.seen(block_id):
+            return None
+        now = self.clock()
+        entries = self._entries
+        # entries are in insertion (= time) order, so expired ids are all at the front
+        evicted = []
+        while entries:
+            oid, t = next(iter(entries.items()))
+            if now - t < self.ttl and (self.capacity is None or len(entries) < self.capacity):
+                break
+            entries.popitem(last=False)
+            evicted.append((oid, t))
+        entries[block_id] = now
+        return (block_id, evicted)
+
+    def undo(self, token) -> None:
+        block_id, evicted = token
+        self._entries.pop(block_id, None)
+        for oid, t in reversed(evicted):
+            self._entries[oid] = t
+            self._entries.move_to_end(oid, last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memory_bytes(self) -> int:
+        # OrderedDict keeps a linked-list node per entry on top of the dict slot
+        return sys.getsizeof(self._entries) + len(self._entries) * (_ID_BYTES + 2 * sys.getsizeof(0.0))
+
+    def bounded(self) -> bool:
+        return self.capacity is None or len(self._entries) <= self.capacity
+
+    def summary(self) -> Dict[str, Any]:
+        out = super().summary()
+        out["ttl"] = self.ttl
+        out["capacity"] = self.capacity
+        return out
+
+
+class BloomDedup(DedupWindow):
+    """
+    Approximate window backed by two rotating Bloom filter generations.
+    Each generation holds up to `capacity` ids at `fp_rate`; when the current
+    one fills up it becomes the previous one and a fresh generation starts,
+    so at least the last `capacity` ids are always remembered.
+    False positives (a new id reported as seen) occur at roughly 2 * fp_rate.
+    """
+
+    name = "bloom"
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 1e-4):
+        if capacity <= 0 or not 0.0 < fp_rate < 1.0:
+            raise ValueError("BloomDedup needs capacity > 0 and 0 < fp_rate < 1")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._cur = bytearray((self.num_bits + 7) // 8)
+        self._prev = bytearray(len(self._cur))
+        self._cur_count = 0
+        self._prev_count = 0
+
+    def _positions(self, block_id: str):
+        d = hashlib.blake2b(block_id.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _has(bits: bytearray, positions) -> bool:
+        for p in positions:
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def seen(self, block_id: str) -> bool:
+        pos = self._positions(block_id)
+        return self._has(self._cur, pos) or self._has(self._prev, pos)
+
+    def remember(self, block_id: str):
+        pos = self._positions(block_id)
+        if self._has(self._cur, pos) or self._has(self._prev, pos):
+            return None
+        rotated = None
+        if self._cur_count >= self.capacity:
+            rotated = (self._prev, self._prev_count)
+            self._prev, self._prev_count = self._cur, self._cur_count
+            self._cur, self._cur_count = bytearray(len(self._prev)), 0
+        cur = self._cur
+        flipped = []
+        for p in pos:
+            mask = 1 << (p & 7)
+            if not cur[p >> 3] & mask:
+                cur[p >> 3] |= mask
+                flipped.append(p)
+        self._cur_count += 1
+        return (flipped, rotated)
+
+    def undo(self, token) -> None:
+        flipped, rotated = token
+        cur = self._cur
+        for p in flipped:
+            cur[p >> 3] &= ~(1 << (p & 7)) & 0xFF
+        self._cur_count -= 1
+        if rotated is not None:
+            self._cur, self._cur_count = self._prev, self._prev_count
+            self._prev, self._prev_count = rotated
+
+    def __len__(self) -> int:
+        return self._cur_count + self._prev_count
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._cur) + sys.getsizeof(self._prev)
+
+    def bounded(self) -> bool:
+        return self._cur_count <= self.capacity and self._prev_count <= self.capacity
+
+    def summary(self) -> Dict[str, Any]:
+        out = super().summary()
+        out.update({"capacity": self.capacity, "fp_rate": self.fp_rate, "num_bits": self.num_bits, "num_hashes": self.num_hashes})
+        return out
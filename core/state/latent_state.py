@@ -1,70 +1,184 @@
 # core/state/latent_state.py
 import copy
-from collections import deque
 from typing import Any, Dict, Optional
+from core.state.dedup import DedupWindow, LRUDedup
+
+_MISSING = object()
+
+
+def _undo_attr(state, name, old):
+    setattr(state, name, old)
+
+
+def _undo_history_append(state):
+    state.short_history.pop()
+
+
+def _undo_remember(state, token):
+    state.dedup.undo(token)
+
+
+def _undo_type_index(state, block_type, old_count, old_short, old_last):
+    if old_count:
+        state.type_counts[block_type] = old_count
+    else:
+        state.type_counts.pop(block_type, None)
+    if old_short:
+        state.short_type_counts[block_type] = old_short
+    else:
+        state.short_type_counts.pop(block_type, None)
+    if old_last is _MISSING:
+        state.type_last.pop(block_type, None)
+    else:
+        state.type_last[block_type] = old_last
+
+
+def _undo_core_entry(state, block_type, old):
+    if old is _MISSING:
+        state.compressed_core.pop(block_type, None)
+    else:
+        state.compressed_core[block_type] = old
+
 
 class LatentState:
     """
     Bounded-memory state with:
     - short_history (recent blocks)
     - compressed_core (summarized)
-    - dedup LRU (idempotency)
+    - dedup window (idempotency): exact LRU by default, or any DedupWindow
+      backend from core/state/dedup.py (TTL, rotating Bloom)
+    - per-type index (type_counts / short_type_counts / type_last), kept
+      incrementally so core/state/view.py lookups are O(1)
+
+    Transactions (begin/commit/abort) keep an undo log of only the fields
+    and core entries touched by update()/_compress(), so abort() costs
+    O(delta) instead of a full snapshot()/rollback() deepcopy.
     """
 
-    def __init__(self, max_history: int = 3, dedup_capacity: int = 512):
+    def __init__(self, max_history: int = 3, dedup_capacity: int = 512, dedup: Optional[DedupWindow] = None):
         self.short_history = []
         self.compressed_core: Dict[str, Dict[str, Any]] = {}
         self.counter = 0
         self.max_history = max_history
 
         # idempotency
-        self.dedup_capacity = dedup_capacity
-        self._dedup_lru = deque(maxlen=dedup_capacity)
-        self._dedup_set = set()
+        self.dedup = dedup if dedup is not None else LRUDedup(dedup_capacity)
+        self.dedup_capacity = getattr(self.dedup, "capacity", dedup_capacity)
+
+        # per-type index: effective count (core + short), count within
+        # short_history, and last content seen for each block_type
+        self.type_counts: Dict[str, int] = {}
+        self.short_type_counts: Dict[str, int] = {}
+        self.type_last: Dict[str, Any] = {}
 
-        # for invariants
+        # for invariants (running totals, so checks don't rescan the state)
         self.seen_events = 0
+        self.dedup_hits = 0
+        self.core_total = 0
 
         # compression stats
         self.compress_count = 0
 
+        # undo log of the active transaction (None = no transaction)
+        self._journal = None
+        self._journal_core = None
+
     def snapshot(self):
         return copy.deepcopy(self)
 
     def rollback(self, snap):
         self.__dict__.update(copy.deepcopy(snap.__dict__))
 
+    def to_bytes(self) -> bytes:
+        """Compact versioned binary encoding (see core/state/codec.py)."""
+        from core.state.codec import encode_state
+        return encode_state(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, allow_pickle: bool = False) -> "LatentState":
+        """allow_pickle=True also decodes pickled values; only for trusted data."""
+        from core.state.codec import decode_state
+        return decode_state(data, allow_pickle=allow_pickle)
+
+    # ---- transactions ----
+    @property
+    def in_transaction(self) -> bool:
+        return self._journal is not None
+
+    def begin(self):
+        if self._journal is not None:
+            raise RuntimeError("LatentState transaction already active")
+        self._journal = []
+        self._journal_core = set()
+
+    def commit(self):
+        self._journal = None
+        self._journal_core = None
+
+    def abort(self):
+        journal = self._journal
+        if journal is None:
+            return
+        # stop logging while undoing
+        self._journal = None
+        self._journal_core = None
+        for entry in reversed(journal):
+            entry[0](self, *entry[1:])
+
+    def _log_attr(self, name: str):
+        if self._journal is not None:
+            self._journal.append((_undo_attr, name, getattr(self, name)))
+
+    def _log_core_entry(self, block_type: str):
+        if self._journal is None or block_type in self._journal_core:
+            return
+        self._journal_core.add(block_type)
+        old = self.compressed_core.get(block_type, _MISSING)
+        if old is not _MISSING and isinstance(old, dict):
+            old = dict(old)
+            if isinstance(old.get("recent"), list):
+                old["recent"] = list(old["recent"])
+        self._journal.append((_undo_core_entry, block_type, old))
+
     def seen(self, block_id: str) -> bool:
-        return block_id in self._dedup_set
+        return self.dedup.seen(block_id)
 
     def remember(self, block_id: str):
-        if block_id in self._dedup_set:
-            return
-        if len(self._dedup_lru) >= self.dedup_capacity:
-            # evict oldest
-            old = self._dedup_lru[0]
-            # deque will drop it after append; remove from set now or later
-            # but since deque doesn't expose the popped element directly on append,
-            # do manual eviction when full:
-            old = self._dedup_lru.popleft()
-            self._dedup_set.discard(old)
-        self._dedup_lru.append(block_id)
-        self._dedup_set.add(block_id)
+        token = self.dedup.remember(block_id)
+        if token is not None and self._journal is not None:
+            self._journal.append((_undo_remember, token))
 
     def update(self, block) -> Optional[Dict[str, Any]]:
         """
         Returns compress_trace if compression happened, else None.
         Idempotent: repeated block_id won't modify state.
         """
+        self._log_attr("seen_events")
         self.seen_events += 1
 
         if self.seen(block.block_id):
             # idempotent no-op
+            self._log_attr("dedup_hits")
+            self.dedup_hits += 1
             return {"dedup": True, "block_id": block.block_id}
 
         self.remember(block.block_id)
+        self._log_attr("counter")
         self.counter += 1
         self.short_history.append(block)
+        t = block.block_type
+        if self._journal is not None:
+            self._journal.append((_undo_history_append,))
+            self._journal.append((
+                _undo_type_index,
+                t,
+                self.type_counts.get(t, 0),
+                self.short_type_counts.get(t, 0),
+                self.type_last.get(t, _MISSING),
+            ))
+        self.type_counts[t] = self.type_counts.get(t, 0) + 1
+        self.short_type_counts[t] = self.short_type_counts.get(t, 0) + 1
+        self.type_last[t] = block.content
 
         if len(self.short_history) >= self.max_history:
             return self._compress()
@@ -77,6 +191,7 @@ class LatentState:
 
         for block in self.short_history:
             t = block.block_type
+            self._log_core_entry(t)
             entry = self.compressed_core.get(
                 t,
                 {"count": 0, "first_seen": block.content, "last": None, "recent": []},
@@ -88,7 +203,13 @@ class LatentState:
             self.compressed_core[t] = entry
             delta[t] = delta.get(t, 0) + 1
 
+        self._log_attr("short_history")
+        self._log_attr("short_type_counts")
+        self._log_attr("compress_count")
+        self._log_attr("core_total")
+        self.core_total += before_len
         self.short_history = []
+        self.short_type_counts = {}
         self.compress_count += 1
         return {
             "type": "compress",
@@ -102,10 +223,12 @@ class LatentState:
         return {
             "steps": self.counter,
             "seen_events": self.seen_events,
+            "dedup_hits": self.dedup_hits,
             "compressed_core": self.compressed_core,
             "short_history_len": len(self.short_history),
             "compress_count": self.compress_count,
-            "dedup_size": len(self._dedup_set),
+            "dedup_size": len(self.dedup),
+            "dedup": self.dedup.summary(),
         }
 
 
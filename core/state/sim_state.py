@@ -0,0 +1,194 @@
+# core/state/sim_state.py
+"""
+Lightweight planning states: SimState overlays simulated blocks on a base
+LatentState without copying it.
+
+- per-type index (type_counts / short_type_counts / type_last) is a ChainMap
+  over the base index, so core/state/view.py lookups work unchanged
+- snapshot() copies only the overlay (O(simulated types)), update() applies a
+  block in place with the same dedup / counting / compression-cadence rules as
+  LatentState.update; apply() = snapshot() + update()
+- key is a 64-bit hash of (type_counts, type_last), maintained incrementally
+  per update and stable across processes; planning_key() gives the same value
+  for a plain LatentState
+- materialize() replays the simulated blocks onto a real copy of the base
+
+The base must not change while SimStates built on it are in use. Simulated
+block ids are never evicted from the overlay's dedup set (plans are short).
+"""
+import hashlib
+from collections import ChainMap
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=65536)
+def _count_term(block_type: str, n: int) -> int:
+    return _h64(f"c\0{block_type}\0{n}") if n else 0
+
+
+def _last_term(block_type: str, content: Any) -> int:
+    return _h64(f"l\0{block_type}\0{content!r}")
+
+
+def index_key(type_counts: Dict[str, int], type_last: Dict[str, Any]) -> int:
+    """XOR of one term per (type, count) and per (type, last content)."""
+    k = 0
+    for t, n in type_counts.items():
+        k ^= _count_term(t, n)
+    for t, c in type_last.items():
+        k ^= _last_term(t, c)
+    return k
+
+
+def planning_key(state) -> int:
+    """Hashable planning key: SimState.key, or computed from a LatentState's type index."""
+    k = getattr(state, "key", None)
+    if k is not None:
+        return k
+    return index_key(state.type_counts, state.type_last)
+
+
+class SimState:
+    """
+    Copy-on-snapshot overlay over a base LatentState (see module docstring).
+    """
+
+    __slots__ = ("base", "type_counts", "short_type_counts", "type_last", "counter",
+                 "seen_events", "dedup_hits", "compress_count", "key",
+                 "_short_len", "_ids", "_applied")
+
+    def __init__(self, base, key: Optional[int] = None):
+        self.base = base
+        self.type_counts = ChainMap({}, base.type_counts)
+        self.short_type_counts = ChainMap({}, base.short_type_counts)
+        self.type_last = ChainMap({}, base.type_last)
+        self.counter = base.counter
+        self.seen_events = base.seen_events
+        self.dedup_hits = base.dedup_hits
+        self.compress_count = base.compress_count
+        self.key = index_key(base.type_counts, base.type_last) if key is None else key
+        self._short_len = len(base.short_history)
+        self._ids = frozenset()
+        self._applied = None  # (block, previous) chain, newest first
+
+    @property
+    def max_history(self) -> int:
+        return self.base.max_history
+
+    def snapshot(self) -> "SimState":
+        s = SimState.__new__(SimState)
+        s.base = self.base
+        s.type_counts = ChainMap(dict(self.type_counts.maps[0]), *self.type_counts.maps[1:])
+        s.short_type_counts = ChainMap(dict(self.short_type_counts.maps[0]), *self.short_type_counts.maps[1:])
+        s.type_last = ChainMap(dict(self.type_last.maps[0]), *self.type_last.maps[1:])
+        s.counter = self.counter
+        s.seen_events = self.seen_events
+        s.dedup_hits = self.dedup_hits
+        s.compress_count = self.compress_count
+        s.key = self.key
+        s._short_len = self._short_len
+        s._ids = self._ids
+        s._applied = self._applied
+        return s
+
+    def seen(self, block_id: str) -> bool:
+        return block_id in self._ids or self.base.seen(block_id)
+
+    def update(self, block) -> Optional[Dict[str, Any]]:
+        """Simulated LatentState.update: same return values, no base mutation."""
+        self.seen_events += 1
+        bid = block.block_id
+        if self.seen(bid):
+            self.dedup_hits += 1
+            return {"dedup": True, "block_id": bid}
+
+        self._ids = self._ids | {bid}
+        self._applied = (block, self._applied)
+        self.counter += 1
+        t = block.block_type
+        n = self.type_counts.get(t, 0)
+        k = self.key ^ _count_term(t, n) ^ _count_term(t, n + 1)
+        if t in self.type_last:
+            k ^= _last_term(t, self.type_last[t])
+        self.key = k ^ _last_term(t, block.content)
+        self.type_counts[t] = n + 1
+        self.type_last[t] = block.content
+        self.short_type_counts[t] = self.short_type_counts.get(t, 0) + 1
+        self._short_len += 1
+
+        if self._short_len >= self.base.max_history:
+            # compression folds short_history into the core; effective counts are unchanged
+            self.short_type_counts = ChainMap({})
+            self._short_len = 0
+            self.compress_count += 1
+            return {"type": "compress", "simulated": True}
+        return None
+
+    def detach(self) -> tuple:
+        """Overlay only (no base), e.g. to ship to a process that already holds the base."""
+        stc = self.short_type_counts
+        return (dict(self.type_counts.maps[0]), len(stc.maps) > 1, dict(stc.maps[0]),
+                dict(self.type_last.maps[0]), self.counter, self.seen_events, self.dedup_hits,
+                self.compress_count, self.key, self._short_len, self._ids, self._applied)
+
+    @classmethod
+    def attach(cls, base, overlay: tuple) -> "SimState":
+        """Inverse of detach() over an equivalent base (e.g. one decoded with from_bytes)."""
+        (tc, stc_on_base, stc, tl, counter, seen_events, dedup_hits,
+         compress_count, key, short_len, ids, applied) = overlay
+        s = cls.__new__(cls)
+        s.base = base
+        s.type_counts = ChainMap(tc, base.type_counts)
+        s.short_type_counts = ChainMap(stc, base.short_type_counts) if stc_on_base else ChainMap(stc)
+        s.type_last = ChainMap(tl, base.type_last)
+        s.counter = counter
+        s.seen_events = seen_events
+        s.dedup_hits = dedup_hits
+        s.compress_count = compress_count
+        s.key = key
+        s._short_len = short_len
+        s._ids = ids
+        s._applied = applied
+        return s
+
+    def apply(self, block) -> "SimState":
+        s = self.snapshot()
+        s.update(block)
+        return s
+
+    @property
+    def simulated_blocks(self):
+        out = []
+        node = self._applied
+        while node is not None:
+            out.append(node[0])
+            node = node[1]
+        out.reverse()
+        return out
+
+    def materialize(self):
+        """A real LatentState: a snapshot of the base with the simulated blocks applied."""
+        state = self.base.snapshot()
+        for b in self.simulated_blocks:
+            state.update(b)
+        return state
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "steps": self.counter,
+            "seen_events": self.seen_events,
+            "dedup_hits": self.dedup_hits,
+            "type_counts": dict(self.type_counts),
+            "short_history_len": self._short_len,
+            "compress_count": self.compress_count,
+            "simulated": len(self._ids),
+            "key": self.key,
+        }
+
+    def __repr__(self):
+        return f"<SimState key={self.key:016x} simulated={len(self._ids)}>"
@@ -3,5 +3,11 @@ class StateDelta:
     def __init__(self, before, after):
         self.delta_steps = after.counter - before.counter
 
+    @classmethod
+    def from_counters(cls, before_counter: int, after_counter: int):
+        d = cls.__new__(cls)
+        d.delta_steps = after_counter - before_counter
+        return d
+
     def summary(self):
         return {"delta_steps": self.delta_steps}
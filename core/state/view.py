@@ -1,6 +1,11 @@
 # core/state/view.py
+# O(1) lookups through LatentState's per-type index; states without the index
+# (e.g. hand-built or duck-typed states) fall back to scanning short_history.
 
 def effective_type_count(state, block_type: str) -> int:
+    index = getattr(state, "type_counts", None)
+    if index is not None:
+        return index.get(block_type, 0)
     core_entry = state.compressed_core.get(block_type, {})
     core_count = core_entry.get("count", 0) if isinstance(core_entry, dict) else 0
     inc = 0
@@ -11,10 +16,20 @@ def effective_type_count(state, block_type: str) -> int:
 
 
 def effective_last(state, block_type: str):
+    index = getattr(state, "type_last", None)
+    if index is not None:
+        return index.get(block_type)
     for b in reversed(state.short_history):
         if b.block_type == block_type:
             return b.content
     core_entry = state.compressed_core.get(block_type, {})
     if isinstance(core_entry, dict):
         return core_entry.get("last")
-    return None
\ No newline at end of file
+    return None
+
+
+def short_type_count(state, block_type: str) -> int:
+    index = getattr(state, "short_type_counts", None)
+    if index is not None:
+        return index.get(block_type, 0)
+    return sum(1 for b in state.short_history if b.block_type == block_type)
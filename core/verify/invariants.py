@@ -3,26 +3,50 @@ class InvariantViolation(Exception):
 class Invariants:
     """
     Engineering-correctness invariants.
+    - full=False: O(1) checks against the running totals LatentState keeps
+    - full=True: also recomputes the totals from compressed_core / the type index
     """
 
     @staticmethod
-    def check(state):
-        # INV-1: counter equals seen_events
-        if state.counter != state.seen_events:
-            raise InvariantViolation(f"INV_COUNTER_SEEN_MISMATCH counter={state.counter} seen={state.seen_events}")
+    def check(state, full: bool = True):
+        # INV-1: every seen event is either counted or a dedup hit
+        if state.counter + state.dedup_hits != state.seen_events:
+            raise InvariantViolation(
+                f"INV_COUNTER_SEEN_MISMATCH counter={state.counter} dedup_hits={state.dedup_hits} seen={state.seen_events}"
+            )
 
         # INV-2: counts are conserved
-        core_total = 0
-        for v in state.compressed_core.values():
-            if isinstance(v, dict):
-                core_total += int(v.get("count", 0))
+        if full:
+            core_total = 0
+            for v in state.compressed_core.values():
+                if isinstance(v, dict):
+                    core_total += int(v.get("count", 0))
+            if core_total != state.core_total:
+                raise InvariantViolation(
+                    f"INV_CORE_TOTAL_DRIFT recomputed={core_total} running={state.core_total}"
+                )
+        else:
+            core_total = state.core_total
         if core_total + len(state.short_history) != state.counter:
             raise InvariantViolation(
                 f"INV_EVENT_COUNT_MISMATCH core_total={core_total} short={len(state.short_history)} counter={state.counter}"
             )
 
-        # INV-3: dedup store bounded
-        if len(state._dedup_lru) > state.dedup_capacity:
-            raise InvariantViolation("INV_DEDUP_OVER_CAPACITY")
+        # INV-3: dedup store bounded (bound depends on the configured backend)
+        if not state.dedup.bounded():
+            raise InvariantViolation(f"INV_DEDUP_OVER_CAPACITY backend={state.dedup.name} size={len(state.dedup)}")
+
+        # INV-4: per-type index agrees with core + short history
+        if full:
+            if sum(state.type_counts.values()) != state.counter:
+                raise InvariantViolation(f"INV_TYPE_INDEX_TOTAL_MISMATCH counter={state.counter}")
+            short = {}
+            for b in state.short_history:
+                short[b.block_type] = short.get(b.block_type, 0) + 1
+            for t, n in state.type_counts.items():
+                entry = state.compressed_core.get(t)
+                core_n = int(entry.get("count", 0)) if isinstance(entry, dict) else 0
+                if core_n + short.get(t, 0) != n or state.short_type_counts.get(t, 0) != short.get(t, 0):
+                    raise InvariantViolation(f"INV_TYPE_INDEX_MISMATCH type={t} index={n} core={core_n} short={short.get(t, 0)}")
 
-        return True
\ No newline at end of file
+        return True
@@ -0,0 +1,36 @@
+# core/verify/policy.py
+import random
+from typing import Optional
+
+
+class VerifyPolicy:
+    """
+    Decides whether the Verifier runs for the n-th verified block (n starts at 1).
+    """
+
+    def should_verify(self, n: int) -> bool:
+        raise NotImplementedError
+
+
+class Always(VerifyPolicy):
+    def should_verify(self, n: int) -> bool:
+        return True
+
+
+class EveryN(VerifyPolicy):
+    def __init__(self, n: int):
+        if n <= 0:
+            raise ValueError("EveryN needs n > 0")
+        self.n = n
+
+    def should_verify(self, n: int) -> bool:
+        return n % self.n == 0
+
+
+class Sampled(VerifyPolicy):
+    def __init__(self, rate: float, seed: Optional[int] = None):
+        self.rate = rate
+        self._rng = random.Random(seed)
+
+    def should_verify(self, n: int) -> bool:
+        return self._rng.random() < self.rate
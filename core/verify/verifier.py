@@ -1,14 +1,35 @@
+from typing import Optional
 from core.verify.invariants import Invariants, InvariantViolation
+from core.verify.policy import VerifyPolicy
 
 
 class Verifier:
     """
     Runs invariants (and later post-checks) after update / compression.
+    - incremental=True: O(1) checks against running totals, with a full
+      recomputation every `full_every` verifications as a consistency audit
+    - policy: which blocks get verified at all (Always / EveryN / Sampled, default always)
     """
 
+    def __init__(self, incremental: bool = True, full_every: Optional[int] = 1000, policy: Optional[VerifyPolicy] = None):
+        self.incremental = incremental
+        self.full_every = full_every
+        self.policy = policy
+        self.calls = 0
+        self.verified = 0
+
     def verify(self, state):
+        self.calls += 1
+        if self.policy is not None and not self.policy.should_verify(self.calls):
+            return True
+        self.verified += 1
+        full = not self.incremental or (self.full_every is not None and self.verified % self.full_every == 0)
         try:
-            Invariants.check(state)
+            Invariants.check(state, full=full)
         except InvariantViolation as e:
             raise
-        return True
\ No newline at end of file
+        return True
+
+    def verify_full(self, state):
+        Invariants.check(state, full=True)
+        return True
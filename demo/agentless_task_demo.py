@@ -36,11 +36,7 @@ def demo():
 
     goal = {"goal": "cancel_order"}
 
-    # Planner domain functions
-    def state_key(s):
-        # minimal key from compressed_core + short_history len
-        return repr(s.summary()["compressed_core"]) + f":{len(s.short_history)}"
-
+    # Planner domain functions (state keys default to planning_key on SimState)
     def goal_test(s, g):
         # satisfied if we have at least one tool_result of cancel_order
         # Here we just check count of tool_result blocks (event type tool_result) in state
@@ -56,13 +52,11 @@ def demo():
         ]
 
     def transition_fn(s, act):
-        # Simulate next state without mutating original: snapshot then apply an "action" marker block
-        ns = s.snapshot()
-        ns.update(Block({"simulate": act.name}, block_type="sim"))
-        return ns
+        # s is a SimState overlay: apply() copies only the simulated delta, never the LatentState
+        return s.apply(Block({"simulate": act.name}, block_type="sim"))
 
     planner = SearchPlanner(
-        state_key_fn=state_key,
+        state_key_fn=None,
         action_generator=action_generator,
         transition_fn=transition_fn,
         goal_test=goal_test,
@@ -20,8 +20,7 @@ def demo():
     buf = ContinuousBuffer(delimiter="\n", block_type="event")
 
     buf.append("login\nclick_buy\ncancel_order\n")
-    for b in buf.emit_blocks():
-        state, _, _ = engine.consume(state, b, cost)
+    state, _, _ = engine.consume_many(state, buf.emit_blocks(), cost)
 
     engine.reason(state)
     print("Done. logs/audit.jsonl generated.")
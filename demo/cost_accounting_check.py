@@ -0,0 +1,25 @@
+"""
+Regression check: CostCounter.add_block(block) counts the same bytes as
+add_bytes(block.content), whatever the content (None, str, non-ASCII, dict).
+Run: python -m demo.cost_accounting_check
+"""
+from core.infer.block import Block
+from core.infer.cost import CostCounter
+
+
+def check():
+    contents = [None, "", "hello", "购买苹果", {"intent": "x", "slots": {}}, [1, 2], 3.5]
+    for c in contents:
+        for touch_fp in (False, True):
+            b = Block(c)
+            if touch_fp:
+                b.fingerprint  # also caches the encoded size
+            by_block, by_bytes = CostCounter(), CostCounter()
+            by_block.add_block(b)
+            by_bytes.add_bytes(c)
+            assert by_block.bytes_in == by_bytes.bytes_in, (c, touch_fp, by_block.bytes_in, by_bytes.bytes_in)
+    print("cost accounting: add_block == add_bytes")
+
+
+if __name__ == "__main__":
+    check()
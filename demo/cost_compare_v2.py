@@ -9,7 +9,7 @@ def latentflow_run(n=50, max_history=3):
     for i in range(n):
         b = Block(f"user event {i}", block_type="event")
         cost.add_ops(1)
-        cost.add_bytes(b.content)
+        cost.add_block(b)
         state.update(b)
     return cost, state
 
@@ -0,0 +1,28 @@
+"""
+Regression check: IntentTable.classify honours table order even when
+several triggers start at the same position.
+Run: python -m demo.intent_priority_check
+"""
+from core.lang.schema import Intent, IntentTable
+from core.lang.slu_rule import RuleSLU
+
+
+def check():
+    # a shorter keyword of an earlier intent is a prefix of a later intent's keyword
+    t = IntentTable([Intent("A", keywords=("cancel",)), Intent("B", keywords=("cancel order",))])
+    assert t.classify("please cancel order 5").name == "A"
+    t = IntentTable([Intent("B", keywords=("cancel order",)), Intent("A", keywords=("cancel",))])
+    assert t.classify("please cancel order 5").name == "B"
+
+    # an earlier regex trigger at the same offset as a later keyword
+    t = IntentTable([Intent("P", patterns=(r"cancel\s+order",)), Intent("K", keywords=("cancel",))])
+    assert t.classify("please cancel order 5").name == "P"
+    assert t.classify("please cancel it").name == "K"
+
+    # re.I folds more than str.lower(): "ſ" ~ "s"
+    assert RuleSLU().parse("purchaſe apples")[0].content["intent"] == "create_order"
+    print("intent priority: ok")
+
+
+if __name__ == "__main__":
+    check()
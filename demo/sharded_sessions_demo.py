@@ -0,0 +1,29 @@
+from core.session.sharded import ShardedEngine
+from core.engine import LatentFlowEngine
+from core.infer.block import Block
+from core.verify.verifier import Verifier
+from core.guard.state_guard import StateGuard
+from core.guard.rules import max_steps
+
+
+def make_engine():
+    # module-level so it can be pickled into worker processes
+    return LatentFlowEngine(guard=StateGuard([max_steps(1000)], trace=False), verifier=Verifier())
+
+
+def demo():
+    with ShardedEngine(make_engine, workers=4) as sharded:
+        futures = []
+        for i in range(2000):
+            sid = f"u{i % 100}"
+            futures.append(sharded.submit(sid, Block(f"{sid} event {i}", block_type="event")))
+        for f in futures:
+            f.result()
+
+        print("u1:", sharded.summary("u1"))
+        print("u2:", sharded.reason("u2"))
+        for i, st in enumerate(sharded.stats()):
+            print(f"worker {i}:", st)
+
+if __name__ == "__main__":
+    demo()